@@ -0,0 +1,61 @@
+-- ============================================
+-- X-Bookmark Knowledge Repository - HNSW vector search
+-- Run this in Supabase SQL Editor after 001_initial_schema.sql
+-- ============================================
+
+-- ============================================
+-- POSTS EMBEDDING INDEX
+-- ============================================
+
+-- Replace the ivfflat index with HNSW: better recall without tuning
+-- lists/probes, and no need to rebuild as the archive grows
+DROP INDEX IF EXISTS posts_embedding_idx;
+CREATE INDEX posts_embedding_idx ON posts USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- ============================================
+-- HELPER FUNCTIONS
+-- ============================================
+
+-- Vector similarity search: take the top-K nearest posts first so the
+-- ORDER BY ... LIMIT can use the index, then apply the threshold.
+-- Returns only what result lists need; callers fetch full rows by id.
+-- The return type changed, so the old function must be dropped.
+DROP FUNCTION IF EXISTS match_posts(VECTOR(384), FLOAT, INT);
+
+CREATE FUNCTION match_posts(
+    query_embedding VECTOR(384),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10
+)
+RETURNS TABLE (
+    id TEXT,
+    author_handle TEXT,
+    tags TEXT[],
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            posts.id,
+            posts.author_handle,
+            posts.tags,
+            posts.embedding <=> query_embedding AS distance
+        FROM posts
+        WHERE posts.embedding IS NOT NULL
+        ORDER BY posts.embedding <=> query_embedding
+        LIMIT match_count
+    )
+    SELECT
+        nearest.id,
+        nearest.author_handle,
+        nearest.tags,
+        1 - nearest.distance AS similarity
+    FROM nearest
+    WHERE 1 - nearest.distance > match_threshold
+    ORDER BY nearest.distance;
+END;
+$$;
@@ -0,0 +1,56 @@
+-- ============================================
+-- X-Bookmark Knowledge Repository - Atomic post + media save
+-- Run this in Supabase SQL Editor after 002_hnsw_match_posts.sql
+-- ============================================
+
+-- ============================================
+-- HELPER FUNCTIONS
+-- ============================================
+
+-- Insert a post and its media items in one call (and one transaction),
+-- so a save is a single round-trip and never leaves orphan media rows.
+--   post:  JSON object with posts columns (as built by SupabaseClient)
+--   media: JSON array of post_media objects; post_id is taken from the post
+CREATE OR REPLACE FUNCTION save_post_with_media(
+    post JSONB,
+    media JSONB DEFAULT '[]'::JSONB
+)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_id TEXT;
+BEGIN
+    INSERT INTO posts (
+        id, url, author_handle, author_name, content, posted_at, archived_at,
+        archived_via, tags, topics, notes, importance, thread_position,
+        is_thread, quoted_post_id, quoted_text, quoted_author, quoted_url,
+        embedding
+    )
+    SELECT
+        p.id, p.url, p.author_handle, p.author_name, p.content, p.posted_at,
+        COALESCE(p.archived_at, NOW()), COALESCE(p.archived_via, 'telegram'),
+        p.tags, p.topics, p.notes, p.importance, p.thread_position,
+        COALESCE(p.is_thread, FALSE), p.quoted_post_id, p.quoted_text,
+        p.quoted_author, p.quoted_url, p.embedding
+    FROM jsonb_populate_record(NULL::posts, post) AS p
+    RETURNING posts.id INTO new_id;
+
+    INSERT INTO post_media (
+        post_id, type, url, category, description, extracted_at, extraction_model
+    )
+    SELECT
+        new_id, m.type, m.url, m.category, m.description, m.extracted_at,
+        m.extraction_model
+    FROM jsonb_to_recordset(COALESCE(media, '[]'::JSONB)) AS m(
+        type TEXT,
+        url TEXT,
+        category TEXT,
+        description TEXT,
+        extracted_at TIMESTAMPTZ,
+        extraction_model TEXT
+    );
+
+    RETURN new_id;
+END;
+$$;
@@ -27,6 +27,9 @@ from tools.utils import parse_post_file, ARCHIVE_DIR, BASE_DIR
 from src.embeddings.service import get_embedding_service
 from src.embeddings.vector_store import get_vector_store
 
+# Posts embedded and upserted per batch
+BATCH_SIZE = 32
+
 
 def setup_logging(verbose: bool = False):
     """Configure logging."""
@@ -179,36 +182,55 @@ def migrate(dry_run: bool = False, verbose: bool = False):
     errors = 0
     start = time()
 
-    for post in iter_posts():
+    def flush(batch: list[dict]):
+        nonlocal processed, errors
+        if not batch:
+            return
         try:
-            # Generate embedding text (content + metadata)
-            embed_text = create_embedding_text(post)
-
-            # Generate embedding
-            embedding = embedding_service.generate(embed_text)
-
-            # Store in vector store
-            vector_store.add_post(
-                post_id=post["id"],
-                content=post["body"],
-                metadata=create_metadata(post),
-                embedding=embedding,
+            # One model call and one upsert per batch
+            embeddings = embedding_service.generate_batch(
+                [create_embedding_text(post) for post in batch]
             )
-
-            processed += 1
+            vector_store.add_posts([
+                {
+                    "id": post["id"],
+                    "content": post["body"],
+                    "metadata": create_metadata(post),
+                    "embedding": embedding,
+                }
+                for post, embedding in zip(batch, embeddings)
+            ])
+            processed += len(batch)
 
             if verbose:
-                logger.debug(f"Processed: {post['id']}")
-            elif processed % 10 == 0:
+                for post in batch:
+                    logger.debug(f"Processed: {post['id']}")
+            else:
                 logger.info(f"Progress: {processed}/{posts_count}")
 
         except Exception as e:
-            logger.error(f"Failed to process {post['id']}: {e}")
+            if len(batch) > 1:
+                # Retry one post at a time so a bad post only fails itself
+                logger.warning(
+                    f"Batch starting at {batch[0]['id']} failed ({e}); retrying its posts one by one"
+                )
+                for post in batch:
+                    flush([post])
+                return
+            logger.error(f"Failed to process {batch[0]['id']}: {e}")
             if verbose:
                 import traceback
                 logger.error(traceback.format_exc())
             errors += 1
 
+    batch = []
+    for post in iter_posts():
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            flush(batch)
+            batch = []
+    flush(batch)
+
     elapsed = time() - start
 
     # Report results
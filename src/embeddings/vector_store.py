@@ -24,6 +24,13 @@ DEFAULT_VECTORS_DIR = DEFAULT_DATA_DIR / "vectors"
 # Collection name
 COLLECTION_NAME = "posts"
 
+# HNSW index parameters (applied when the collection is first created).
+# Embeddings are L2-normalized by the embedding service, so cosine distance
+# ranks identically to inner product.
+HNSW_M = 32
+HNSW_CONSTRUCTION_EF = 128
+HNSW_SEARCH_EF = 64
+
 
 class VectorStore:
     """ChromaDB-backed vector store for post embeddings."""
@@ -48,7 +55,13 @@ class VectorStore:
 
         self._collection = self._client.get_or_create_collection(
             name=COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine", "dimension": EMBEDDING_DIMENSION},
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:M": HNSW_M,
+                "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+                "hnsw:search_ef": HNSW_SEARCH_EF,
+                "dimension": EMBEDDING_DIMENSION,
+            },
         )
 
         self._embedding_service = get_embedding_service()
@@ -85,6 +98,44 @@ class VectorStore:
 
         logger.debug(f"Added post to vector store: {post_id}")
 
+    def add_posts(self, posts: list[dict]) -> None:
+        """
+        Add several posts to the vector store in one batch.
+
+        Embeddings missing from the input are generated with a single batched
+        model call, and all posts are written with a single upsert.
+
+        Args:
+            posts: Dicts with keys id, content, and optional metadata/embedding
+        """
+        if not posts:
+            return
+
+        missing = [i for i, p in enumerate(posts) if p.get("embedding") is None]
+        generated = self._embedding_service.generate_batch(
+            [posts[i]["content"] for i in missing]
+        ) if missing else []
+
+        embeddings = [p.get("embedding") for p in posts]
+        for i, embedding in zip(missing, generated):
+            embeddings[i] = embedding
+
+        metadatas = []
+        for post in posts:
+            clean_metadata = self._flatten_metadata(post.get("metadata") or {})
+            content = post["content"]
+            clean_metadata["content_preview"] = content[:500] if content else ""
+            metadatas.append(clean_metadata)
+
+        self._collection.upsert(
+            ids=[p["id"] for p in posts],
+            embeddings=embeddings,
+            metadatas=metadatas,
+            documents=[p["content"] for p in posts],
+        )
+
+        logger.debug(f"Added {len(posts)} posts to vector store")
+
     def search(
         self,
         query: str,
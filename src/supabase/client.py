@@ -77,6 +77,76 @@ class SupabaseClient:
 
         Returns the inserted row.
         """
+        data = self._post_row(
+            post_id=post_id,
+            url=url,
+            content=content,
+            author_handle=author_handle,
+            author_name=author_name,
+            posted_at=posted_at,
+            archived_at=archived_at,
+            archived_via=archived_via,
+            tags=tags,
+            topics=topics,
+            notes=notes,
+            importance=importance,
+            thread_position=thread_position,
+            is_thread=is_thread,
+            quoted_post_id=quoted_post_id,
+            quoted_text=quoted_text,
+            quoted_author=quoted_author,
+            quoted_url=quoted_url,
+            embedding=embedding,
+        )
+        result = self._client.table("posts").insert(data).execute()
+        logger.info(f"Inserted post: {post_id}")
+        return result.data[0] if result.data else None
+
+    def insert_post_with_media(self, media: list[dict] = None, **post) -> str:
+        """
+        Insert a post and its media items atomically in a single request.
+
+        Uses the save_post_with_media RPC (deploy/sql/003_save_post_with_media.sql).
+
+        Args:
+            media: Dicts with the insert_media() arguments; post_id may be omitted
+            **post: The insert_post() arguments
+
+        Returns the inserted post ID.
+        """
+        data = self._post_row(**post)
+        media_rows = [
+            self._media_row(**{"post_id": data["id"], **row}) for row in media or []
+        ]
+        result = self._client.rpc(
+            "save_post_with_media", {"post": data, "media": media_rows}
+        ).execute()
+        logger.info(f"Inserted post with {len(media_rows)} media items: {data['id']}")
+        return result.data
+
+    @staticmethod
+    def _post_row(
+        post_id: str,
+        url: str,
+        content: str,
+        author_handle: str = None,
+        author_name: str = None,
+        posted_at: datetime = None,
+        archived_at: datetime = None,
+        archived_via: str = "telegram",
+        tags: list[str] = None,
+        topics: list[str] = None,
+        notes: str = None,
+        importance: str = None,
+        thread_position: int = None,
+        is_thread: bool = False,
+        quoted_post_id: str = None,
+        quoted_text: str = None,
+        quoted_author: str = None,
+        quoted_url: str = None,
+        embedding: list[float] = None,
+    ) -> dict:
+        """Build a posts row from insert_post() arguments."""
         data = {
             "id": post_id,
             "url": url,
@@ -112,9 +182,7 @@ class SupabaseClient:
         if embedding:
             data["embedding"] = embedding
 
-        result = self._client.table("posts").insert(data).execute()
-        logger.info(f"Inserted post: {post_id}")
-        return result.data[0] if result.data else None
+        return data
 
     def upsert_post(self, post_data: dict) -> dict:
         """
@@ -133,11 +201,11 @@ class SupabaseClient:
         result = self._client.table("posts").select("*").eq("id", post_id).execute()
         return result.data[0] if result.data else None
 
-    def get_recent_posts(self, limit: int = 10) -> list[dict]:
-        """Get the most recently archived posts."""
+    def get_recent_posts(self, limit: int = 10, columns: str = "*") -> list[dict]:
+        """Get the most recently archived posts, optionally selecting only some columns."""
         result = (
             self._client.table("posts")
-            .select("*")
+            .select(columns)
             .order("archived_at", desc=True)
             .limit(limit)
             .execute()
@@ -185,6 +253,39 @@ class SupabaseClient:
         extraction_model: str = None,
     ) -> dict:
         """Insert a media item for a post."""
+        data = self._media_row(
+            post_id, media_type, url, category, description, extraction_model
+        )
+        result = self._client.table("post_media").insert(data).execute()
+        return result.data[0] if result.data else None
+
+    def insert_media_bulk(self, rows: list[dict]) -> list[dict]:
+        """
+        Insert several media items in a single request.
+
+        Args:
+            rows: Dicts with the insert_media() arguments (post_id,
+                  media_type, url, and optional category, description,
+                  extraction_model)
+
+        Returns the inserted rows.
+        """
+        if not rows:
+            return []
+        data = [self._media_row(**row) for row in rows]
+        result = self._client.table("post_media").insert(data).execute()
+        return result.data or []
+
+    @staticmethod
+    def _media_row(
+        post_id: str,
+        media_type: str,
+        url: str,
+        category: str = None,
+        description: str = None,
+        extraction_model: str = None,
+    ) -> dict:
+        """Build a post_media row (same keys every time, as bulk inserts require)."""
         data = {
             "post_id": post_id,
             "type": media_type,
@@ -192,12 +293,11 @@ class SupabaseClient:
             "category": category,
             "description": description,
             "extraction_model": extraction_model,
+            "extracted_at": None,
         }
         if description:
             data["extracted_at"] = datetime.now().isoformat()
-
-        result = self._client.table("post_media").insert(data).execute()
-        return result.data[0] if result.data else None
+        return data
 
     def get_post_media(self, post_id: str) -> list[dict]:
         """Get all media items for a post."""
@@ -0,0 +1,336 @@
+"""
+Offline tests for keyword search and the SQLite side index behind it.
+
+Each test builds a small archive (post files, index.json, tags.json) in a
+temporary directory.
+
+Run with: pytest tests/test_search.py -v
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# tools/ scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+
+import add_post
+import search
+import utils
+from utils import check_duplicate, dump_frontmatter, get_archive_db, load_index
+
+
+POSTS = {
+    "1001": {
+        "author": {"handle": "alice", "name": "Alice"},
+        "archived_at": "2025-01-10T09:00:00",
+        "tags": ["AI", "tutorial"],
+        "topics": ["agents"],
+        "importance": "high",
+        "body": "Building agents with small models.",
+    },
+    "1002": {
+        "author": {"handle": "bob", "name": "Bob"},
+        "archived_at": "2025-01-11T09:00:00",
+        "tags": ["investing"],
+        "topics": ["semis"],
+        "importance": "low",
+        "notes": "Revisit the optics thesis",
+        "body": "Notes on the semiconductor cycle.",
+    },
+    "1003": {
+        "author": {"handle": "alicewonder", "name": "Alice W"},
+        "archived_at": "2025-01-12T09:00:00",
+        "tags": ["ai"],
+        "topics": [],
+        "body": "Small models keep getting better.",
+    },
+}
+
+
+def post_path(post_id: str) -> Path:
+    """Path of a fixture post file."""
+    return utils.ARCHIVE_DIR / "2025" / "01" / f"{post_id}.md"
+
+
+def write_post(post_id: str, fields: dict, mtime_ns: int = None):
+    """Write a post file; an explicit mtime makes same-size edits visible."""
+    fields = dict(fields)
+    body = fields.pop("body")
+    path = post_path(post_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\n{dump_frontmatter({'id': post_id, **fields})}---\n\n{body}\n")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def index_entry(post_id: str, fields: dict) -> dict:
+    """The index.json entry add_post.py would write for a post."""
+    return {
+        "path": str(post_path(post_id).relative_to(utils.BASE_DIR)),
+        "author": fields["author"]["handle"],
+        "archived_at": fields["archived_at"],
+        "tags": fields["tags"],
+        "topics": fields["topics"],
+        "importance": fields.get("importance"),
+    }
+
+
+def ids(results: list) -> set:
+    """Post IDs of search results."""
+    return {r["id"] for r in results}
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """A temporary archive with the POSTS above, indexed in index.json."""
+    monkeypatch.setattr(utils, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(utils, "ARCHIVE_DIR", tmp_path / "archive" / "posts")
+    monkeypatch.setattr(utils, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(utils, "INDEX_LOG_PATH", tmp_path / "data" / "index.ndjson")
+    monkeypatch.setattr(utils, "ARCHIVE_DB_PATH", tmp_path / "data" / "archive.db")
+    monkeypatch.setattr(utils, "_archive_db", None)
+    monkeypatch.setattr(utils, "_data_cache", {})
+    monkeypatch.setattr(search, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(search, "ARCHIVE_DIR", tmp_path / "archive" / "posts")
+    monkeypatch.setattr(add_post, "ARCHIVE_DIR", tmp_path / "archive" / "posts")
+    (tmp_path / "data").mkdir()
+
+    for post_id, fields in POSTS.items():
+        write_post(post_id, fields)
+    index = {"posts": {pid: index_entry(pid, f) for pid, f in POSTS.items()}}
+    (tmp_path / "data" / "index.json").write_text(json.dumps(index))
+    tags = {"tags": {}, "topics": {}}
+    for post_id, fields in POSTS.items():
+        for tag in fields["tags"]:
+            tags["tags"].setdefault(tag, []).append(post_id)
+        for topic in fields["topics"]:
+            tags["topics"].setdefault(topic, []).append(post_id)
+    (tmp_path / "data" / "tags.json").write_text(json.dumps(tags))
+
+    yield tmp_path
+
+    if utils._archive_db is not None:
+        utils._archive_db.close()
+
+
+def rewrite_index(archive: Path, change):
+    """Apply change(index) to index.json on disk."""
+    index_path = archive / "data" / "index.json"
+    index = json.loads(index_path.read_text())
+    change(index)
+    index_path.write_text(json.dumps(index))
+
+
+class TestSearchFilters:
+    """Tests for search_posts() filters and their side index narrowing."""
+
+    def test_no_filters(self, archive):
+        """Test that every post is returned, newest first."""
+        assert [r["id"] for r in search.search_posts()] == ["1003", "1002", "1001"]
+
+    def test_tags_case_insensitive(self, archive):
+        """Test tag matching ignores case."""
+        assert ids(search.search_posts(tags=["ai"])) == {"1001", "1003"}
+        assert ids(search.search_posts(tags=["TUTORIAL"])) == {"1001"}
+
+    def test_tags_and_topics(self, archive):
+        """Test that tag and topic filters combine."""
+        assert ids(search.search_posts(tags=["ai"], topics=["Agents"])) == {"1001"}
+
+    def test_author_substring(self, archive):
+        """Test author matching is a case-insensitive substring match."""
+        assert ids(search.search_posts(author="ALICE")) == {"1001", "1003"}
+        assert ids(search.search_posts(author="bo")) == {"1002"}
+
+    def test_importance(self, archive):
+        """Test the importance filter."""
+        assert ids(search.search_posts(importance="high")) == {"1001"}
+
+    def test_query_body_and_notes(self, archive):
+        """Test text queries match the body and the notes."""
+        assert ids(search.search_posts(query="small MODELS")) == {"1001", "1003"}
+        assert ids(search.search_posts(query="optics")) == {"1002"}
+        assert ids(search.search_posts(query="no such text")) == set()
+
+    def test_short_query_not_narrowed(self, archive):
+        """Test queries too short for trigrams still search every post."""
+        assert search._text_match_ids(get_archive_db(), "on") is None
+        assert ids(search.search_posts(query="on")) == {"1002"}
+
+    def test_narrowing_from_side_index(self, archive):
+        """Test the candidate sets read from the side index."""
+        db = get_archive_db()
+        assert search._tagged_ids(db, "tag", ["AI", "missing"]) == {"1001", "1003"}
+        assert search._tagged_ids(db, "topic", ["semis"]) == {"1002"}
+        assert search._author_ids(db, "alice") == {"1001", "1003"}
+        assert search._importance_ids(db, "low") == {"1002"}
+        assert search._text_match_ids(db, "models") == {"1001", "1003"}
+
+    def test_side_index_unavailable(self, archive, monkeypatch):
+        """Test that searches still work (unnarrowed) without the side index."""
+        def broken():
+            raise utils.sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(search, "get_archive_db", broken)
+        assert search._side_index() is None
+        assert search._tagged_ids(None, "tag", ["ai"]) is None
+        assert ids(search.search_posts(tags=["ai"], author="alice")) == {"1001", "1003"}
+        assert ids(search.search_posts(query="optics")) == {"1002"}
+
+    def test_one_refresh_per_search(self, archive, monkeypatch):
+        """Test a search with every filter checks the post files once."""
+        get_archive_db()
+        calls = []
+        refresh = utils._refresh_archive_db_posts
+        monkeypatch.setattr(
+            utils, "_refresh_archive_db_posts", lambda conn: calls.append(1) or refresh(conn)
+        )
+        search.search_posts(
+            query="models", tags=["ai"], topics=["agents"], author="alice", importance="high"
+        )
+        assert calls == [1]
+        search.search_posts()
+        assert calls == [1]
+
+    def test_check_duplicate_skips_file_refresh(self, archive, monkeypatch):
+        """Test duplicate checks are ID lookups, without stat()ing every post."""
+        get_archive_db()
+        monkeypatch.setattr(utils, "_refresh_archive_db_posts", lambda conn: pytest.fail())
+        assert check_duplicate("1001")
+        assert not check_duplicate("9999")
+
+
+class TestStaleIndex:
+    """Tests that edits reach search even when index.json is stale."""
+
+    def test_body_edit(self, archive):
+        """Test an edited post body is re-indexed for text search."""
+        assert ids(search.search_posts(query="zebracorn")) == set()
+        write_post("1001", {**POSTS["1001"], "body": "A zebracorn appears."})
+        assert ids(search.search_posts(query="zebracorn")) == {"1001"}
+
+    def test_same_size_edit(self, archive):
+        """Test an edit that keeps the file size is still noticed."""
+        get_archive_db()
+        stat = post_path("1003").stat()
+        write_post("1003", {**POSTS["1003"], "body": "Small models keep getting bitter."},
+                   mtime_ns=stat.st_mtime_ns + 1_000_000_000)
+        assert post_path("1003").stat().st_size == stat.st_size
+        assert ids(search.search_posts(query="getting bitter")) == {"1003"}
+
+    def test_notes_edit(self, archive):
+        """Test edited notes are re-indexed for text search."""
+        assert ids(search.search_posts(query="fixedtag")) == set()
+        write_post("1003", {**POSTS["1003"], "notes": "Mentions fixedtag"})
+        assert ids(search.search_posts(query="fixedtag")) == {"1003"}
+
+    def test_frontmatter_tag_edit(self, archive):
+        """Test a tag added in the frontmatter only is found by tag search."""
+        get_archive_db()
+        write_post("1002", {**POSTS["1002"], "tags": ["investing", "FixedTag"]})
+        assert ids(search.search_posts(tags=["fixedtag"])) == {"1002"}
+
+    def test_frontmatter_tag_removed(self, archive):
+        """Test a tag removed from the frontmatter no longer matches."""
+        get_archive_db()
+        write_post("1001", {**POSTS["1001"], "tags": ["tutorial"]})
+        assert ids(search.search_posts(tags=["ai"])) == {"1003"}
+
+    def test_stale_index_values(self, archive):
+        """Test stale author/importance in index.json don't override the frontmatter."""
+        def change(index):
+            index["posts"]["1001"]["author"] = "someone-else"
+            index["posts"]["1001"]["importance"] = "low"
+        rewrite_index(archive, change)
+        assert ids(search.search_posts(author="alice")) == {"1001", "1003"}
+        assert ids(search.search_posts(importance="high")) == {"1001"}
+
+    def test_null_author_in_index(self, archive):
+        """Test an index entry with "author": null doesn't break author search."""
+        rewrite_index(archive, lambda index: index["posts"]["1002"].update(author=None))
+        assert ids(search.search_posts(author="bob")) == {"1002"}
+
+    def test_null_author_in_frontmatter(self, archive):
+        """Test a post with "author: null" is skipped by author search."""
+        write_post("1002", {**POSTS["1002"], "author": None})
+        assert ids(search.search_posts(author="bob")) == set()
+        assert "1002" in ids(search.search_posts())
+
+    def test_deleted_post_file(self, archive):
+        """Test a post whose file is gone drops out of the side index."""
+        get_archive_db()
+        post_path("1003").unlink()
+        assert search._text_match_ids(get_archive_db(), "getting better") == set()
+        assert ids(search.search_posts(tags=["ai"])) == {"1001"}
+
+    def test_index_change_rebuilds(self, archive):
+        """Test posts removed from index.json leave the side index."""
+        get_archive_db()
+        rewrite_index(archive, lambda index: index["posts"].pop("1001"))
+        assert search._author_ids(get_archive_db(), "alice") == {"1003"}
+
+
+def break_post(post_id: str):
+    """Overwrite a post file with frontmatter that isn't valid YAML."""
+    post_path(post_id).write_text("---\ntags: [unclosed\n---\n\nBody.\n")
+
+
+def stored_signature():
+    """The index signature the side index was last brought up to date with."""
+    row = utils._archive_db.execute(
+        "SELECT value FROM meta WHERE key = 'index_signature'"
+    ).fetchone()
+    return row and row[0]
+
+
+class TestAddPost:
+    """Tests for adding posts while keeping the side index up to date."""
+
+    def test_add_updates_side_index_incrementally(self, archive):
+        """Test a new post reaches the side index without a rebuild."""
+        get_archive_db()
+        add_post.create_post_file(
+            "https://x.com/carol/status/1004", "Fresh zebracorn sighting", author_handle="carol"
+        )
+        assert stored_signature() == utils._index_signature()
+        assert search._author_ids(get_archive_db(), "carol") == {"1004"}
+        assert ids(search.search_posts(query="zebracorn")) == {"1004"}
+
+    def test_stale_side_index_not_marked_current(self, archive):
+        """Test an add doesn't hide index changes the side index hasn't seen."""
+        get_archive_db()
+        rewrite_index(archive, lambda index: index["posts"].pop("1001"))
+        add_post.create_post_file("https://x.com/carol/status/1004", "New", author_handle="carol")
+        assert stored_signature() != utils._index_signature()
+        assert search._author_ids(get_archive_db(), "alice") == {"1003"}
+        assert search._author_ids(get_archive_db(), "carol") == {"1004"}
+
+    def test_unparsable_post_elsewhere(self, archive):
+        """Test a post with broken YAML doesn't stop other posts being added."""
+        break_post("1002")
+        add_post.create_post_file("https://x.com/carol/status/1004", "New", author_handle="carol")
+        assert "1004" in load_index()["posts"]
+        assert search._author_ids(get_archive_db(), "carol") == {"1004"}
+        assert check_duplicate("1002") and check_duplicate("1004")
+        assert not check_duplicate("9999")
+        assert ids(search.search_posts(tags=["ai"])) == {"1001", "1003"}
+
+    def test_side_index_failure_keeps_index_entry(self, archive, monkeypatch):
+        """Test a failed side index update is logged and forces a rebuild later."""
+        get_archive_db()
+
+        def failing(conn, post_id, entry):
+            raise utils.sqlite3.OperationalError("no such tokenizer: trigram")
+
+        with monkeypatch.context() as m:
+            m.setattr(utils, "_write_archive_db_post", failing)
+            add_post.create_post_file(
+                "https://x.com/carol/status/1004", "New", author_handle="carol"
+            )
+        assert "1004" in load_index()["posts"]
+        assert stored_signature() is None
+        assert search._author_ids(get_archive_db(), "carol") == {"1004"}
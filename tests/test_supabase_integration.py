@@ -113,6 +113,91 @@ class TestSupabaseClient:
                 pass  # Ignore cleanup errors
 
 
+    def test_insert_media_bulk(self, client):
+        """Test inserting several media items in one request."""
+        test_id = f"test_{uuid4().hex[:8]}"
+
+        try:
+            client.insert_post(
+                post_id=test_id,
+                url=f"https://x.com/test/status/{test_id}",
+                content="Test post with media.",
+                archived_via="test",
+            )
+
+            rows = client.insert_media_bulk([
+                {
+                    "post_id": test_id,
+                    "media_type": "image",
+                    "url": "https://example.com/a.jpg",
+                    "category": "general",
+                    "description": "A test image",
+                    "extraction_model": "test",
+                },
+                {
+                    "post_id": test_id,
+                    "media_type": "video",
+                    "url": "https://example.com/b.mp4",
+                },
+            ])
+            assert len(rows) == 2
+
+            media = client.get_post_media(test_id)
+            assert {m["url"] for m in media} == {
+                "https://example.com/a.jpg",
+                "https://example.com/b.mp4",
+            }
+
+        finally:
+            # Clean up: media rows cascade with the post
+            try:
+                client._client.table("posts").delete().eq("id", test_id).execute()
+            except Exception:
+                pass  # Ignore cleanup errors
+
+    def test_insert_media_bulk_empty(self, client):
+        """Test that an empty batch makes no request."""
+        assert client.insert_media_bulk([]) == []
+
+    def test_insert_post_with_media(self, client):
+        """Test inserting a post and its media in one RPC call."""
+        test_id = f"test_{uuid4().hex[:8]}"
+
+        try:
+            returned_id = client.insert_post_with_media(
+                media=[
+                    {
+                        "media_type": "image",
+                        "url": "https://example.com/a.jpg",
+                        "category": "chart",
+                        "description": "A test chart",
+                        "extraction_model": "test",
+                    },
+                ],
+                post_id=test_id,
+                url=f"https://x.com/test/status/{test_id}",
+                content="Test post saved with media.",
+                tags=["test"],
+                archived_via="test",
+            )
+            assert returned_id == test_id
+
+            post = client.get_post(test_id)
+            assert post["content"] == "Test post saved with media."
+            assert post["tags"] == ["test"]
+
+            media = client.get_post_media(test_id)
+            assert len(media) == 1
+            assert media[0]["category"] == "chart"
+            assert media[0]["extracted_at"] is not None
+
+        finally:
+            try:
+                client._client.table("posts").delete().eq("id", test_id).execute()
+            except Exception:
+                pass  # Ignore cleanup errors
+
+
 class TestEmbeddingService:
     """Tests for the embedding service."""
 
@@ -0,0 +1,86 @@
+"""
+Offline tests for the Telegram bot's duplicate-check cache.
+
+Skipped unless python-telegram-bot and the bot's other dependencies are
+installed. Supabase is never contacted: the client is replaced by a stub.
+
+Run with: pytest tests/test_telegram_bot.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# tools/ scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+
+pytest.importorskip("telegram")
+telegram_bot = pytest.importorskip("telegram_bot")
+
+
+class FakeDb:
+    """Stands in for the Supabase client, counting post_exists() calls."""
+
+    def __init__(self, archived=()):
+        self.archived = set(archived)
+        self.calls = []
+
+    def post_exists(self, post_id: str) -> bool:
+        self.calls.append(post_id)
+        return post_id in self.archived
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """An empty duplicate cache backed by a fake database."""
+    db = FakeDb(archived={"1"})
+    monkeypatch.setattr(telegram_bot, "_dup_cache", type(telegram_bot._dup_cache)())
+    monkeypatch.setattr(telegram_bot, "get_db", lambda: db)
+    return db
+
+
+def check(post_id: str) -> bool:
+    """Run the async duplicate check."""
+    return asyncio.run(telegram_bot.check_duplicate_supabase(post_id))
+
+
+class TestDuplicateCache:
+    """Tests for the LRU cache in front of check_duplicate_supabase()."""
+
+    def test_hits_skip_the_database(self, fake_db):
+        """Test both answers are cached after the first lookup."""
+        assert check("1") is True
+        assert check("2") is False
+        assert check("1") is True
+        assert check("2") is False
+        assert fake_db.calls == ["1", "2"]
+
+    def test_remember_archived(self, fake_db):
+        """Test a post saved by the bot is reported as a duplicate without a lookup."""
+        assert check("2") is False
+        telegram_bot.remember_archived("2")
+        assert check("2") is True
+        assert fake_db.calls == ["2"]
+
+    def test_evicts_least_recently_used(self, fake_db, monkeypatch):
+        """Test the cache stays bounded and drops the least recently used entry."""
+        monkeypatch.setattr(telegram_bot, "DUP_CACHE_MAX", 2)
+        check("a")
+        check("b")
+        check("a")  # now "b" is least recently used
+        check("c")
+        assert list(telegram_bot._dup_cache) == ["a", "c"]
+
+        check("b")
+        assert fake_db.calls == ["a", "b", "c", "b"]
+
+    def test_lookup_errors_not_cached(self, fake_db, monkeypatch):
+        """Test a failed lookup returns False and is retried next time."""
+        def failing(post_id):
+            raise ConnectionError("offline")
+
+        monkeypatch.setattr(fake_db, "post_exists", failing)
+        assert check("1") is False
+        assert "1" not in telegram_bot._dup_cache
@@ -0,0 +1,325 @@
+"""
+Unit tests for the archive helpers in tools/utils.py.
+
+These run offline, against temporary files only.
+
+Run with: pytest tests/test_utils.py -v
+"""
+
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# tools/ scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+
+import utils
+from utils import (
+    append_index_entry,
+    compact_index,
+    dump_frontmatter,
+    json_dumps,
+    json_loads,
+    load_index,
+    load_tags,
+    parse_frontmatter,
+    parse_post_file,
+    save_index,
+    save_tags,
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the index files at an empty temporary data directory."""
+    monkeypatch.setattr(utils, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(utils, "INDEX_LOG_PATH", tmp_path / "index.ndjson")
+    monkeypatch.setattr(utils, "ARCHIVE_DB_PATH", tmp_path / "archive.db")
+    monkeypatch.setattr(utils, "_archive_db", None)
+    monkeypatch.setattr(utils, "_data_cache", {})
+    return tmp_path
+
+
+@pytest.fixture(params=["orjson", "ujson", "json"])
+def json_backend(request, monkeypatch):
+    """Run a test with each JSON library utils can use (skipping missing ones)."""
+    if request.param != "json" and getattr(utils, request.param) is None:
+        pytest.skip(f"{request.param} is not installed")
+    if request.param != "orjson":
+        monkeypatch.setattr(utils, "orjson", None)
+    if request.param == "json":
+        monkeypatch.setattr(utils, "ujson", None)
+    return request.param
+
+
+def write_file(path: Path, text: str, mtime_ns: int):
+    """Write a file with a given modification time (so the change is seen)."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def round_trip(metadata: dict) -> dict:
+    """Dump metadata as frontmatter and parse it back."""
+    return parse_frontmatter(dump_frontmatter(metadata))
+
+
+class TestDumpFrontmatter:
+    """Tests for the frontmatter emitter, checked against the YAML parser."""
+
+    @pytest.mark.parametrize("text", [
+        'say "hi"',
+        "back\\slash",
+        "line one\nline two",
+        "tab\there",
+        "carriage\rreturn",
+        "bell\x07 and nul\x00 and del\x7f",
+        "c1 control\x85 and nbsp\xa0",
+        "line\u2028separator and paragraph\u2029separator",
+        "\ufeffbom first",
+        "unicode: café, 日本語, emoji 🚀",
+        "  leading and trailing spaces  ",
+        "- looks like a list",
+        "key: value # not a comment",
+        "#hashtag",
+        "",
+    ])
+    def test_string_escapes(self, text):
+        """Test that awkward strings survive the round trip unchanged."""
+        assert round_trip({"content": text}) == {"content": text}
+
+    @pytest.mark.parametrize("text", [
+        "yes", "no", "on", "off", "true", "False",
+        "null", "Null", "~", "", "123", "0x1f", "1e3", "2025-01-01", ".nan",
+    ])
+    def test_strings_that_look_like_other_types(self, text):
+        """Test that strings YAML would resolve to bools/nulls/numbers stay strings."""
+        assert round_trip({"value": text}) == {"value": text}
+
+    def test_scalars(self):
+        """Test None, bools and ints."""
+        metadata = {"a": None, "b": True, "c": False, "d": 0, "e": -42, "f": 10**20}
+        assert round_trip(metadata) == metadata
+
+    def test_nested_dicts(self):
+        """Test nested mappings."""
+        metadata = {"author": {"handle": "someone", "name": "Some One"},
+                    "outer": {"inner": {"deep": "value"}}}
+        assert round_trip(metadata) == metadata
+
+    def test_lists_of_dicts(self):
+        """Test lists mixing scalars and mappings."""
+        metadata = {
+            "tags": ["ai", "yes", "~"],
+            "media": [
+                {"type": "image", "url": "https://example.com/a.png"},
+                {"type": "video", "url": "https://example.com/b.mp4", "nested": {"k": 1}},
+            ],
+            "mixed": ["text", None, 3, {"only": "key"}],
+        }
+        assert round_trip(metadata) == metadata
+
+    def test_empty_containers(self):
+        """Test empty dicts and lists, top-level and nested."""
+        metadata = {"tags": [], "extra": {}, "media": [{}], "outer": {"inner": []}}
+        assert round_trip(metadata) == metadata
+
+    def test_key_order_is_kept(self):
+        """Test that fields are written in insertion order."""
+        metadata = {"zeta": 1, "alpha": 2, "mid": 3}
+        assert list(round_trip(metadata)) == ["zeta", "alpha", "mid"]
+
+    @pytest.mark.parametrize("metadata", [
+        {"score": 1.5},
+        {"posted": date(2025, 1, 2)},
+        {"nested": [["a", "b"], []]},
+        {"not an identifier": "value"},
+        {1: "int key"},
+        {"noncharacter": "\uffff"},
+    ])
+    def test_fallback_to_pyyaml(self, metadata):
+        """Test that values the emitter can't write go through PyYAML instead."""
+        assert round_trip(metadata) == metadata
+
+
+class TestIndexLog:
+    """Tests for index.ndjson, the append log next to index.json."""
+
+    def test_append_and_replay(self, data_dir):
+        """Test that appended entries are read back after a cold start."""
+        save_index({"posts": {"1": {"path": "a.md"}, "2": {"path": "b.md"}}})
+        append_index_entry("3", {"path": "c.md"})
+        append_index_entry("1", {"path": "a2.md"})
+
+        utils._data_cache.clear()
+        posts = load_index()["posts"]
+        assert posts == {"1": {"path": "a2.md"}, "2": {"path": "b.md"}, "3": {"path": "c.md"}}
+        assert json.loads((data_dir / "index.json").read_text())["posts"]["1"] == {"path": "a.md"}
+
+    def test_append_without_index_json(self, data_dir):
+        """Test that the log alone is a valid index."""
+        append_index_entry("1", {"path": "a.md"})
+        utils._data_cache.clear()
+        assert load_index()["posts"] == {"1": {"path": "a.md"}}
+        assert not (data_dir / "index.json").exists()
+
+    def test_save_index_empties_log(self, data_dir):
+        """Test that a full save folds the log into index.json."""
+        append_index_entry("1", {"path": "a.md"})
+        save_index(load_index())
+        assert not utils.INDEX_LOG_PATH.exists()
+        utils._data_cache.clear()
+        assert load_index()["posts"] == {"1": {"path": "a.md"}}
+
+    def test_truncated_last_line(self, data_dir):
+        """Test that a line cut short by a crash is skipped and not appended to."""
+        append_index_entry("1", {"path": "a.md"})
+        with open(utils.INDEX_LOG_PATH, "ab") as f:
+            f.write(b'{"posts": {"2": {"pa')
+
+        utils._data_cache.clear()
+        assert load_index()["posts"] == {"1": {"path": "a.md"}}
+
+        append_index_entry("3", {"path": "c.md"})
+        utils._data_cache.clear()
+        assert load_index()["posts"] == {"1": {"path": "a.md"}, "3": {"path": "c.md"}}
+
+    def test_compacts_past_size_limit(self, data_dir, monkeypatch):
+        """Test that the log is folded into index.json once it grows too large."""
+        monkeypatch.setattr(utils, "INDEX_LOG_COMPACT_SIZE", 300)
+        for i in range(20):
+            append_index_entry(str(i), {"path": f"{i}.md"})
+            if not utils.INDEX_LOG_PATH.exists():
+                break
+        else:
+            pytest.fail("index log was never compacted")
+
+        assert i < 19
+        on_disk = json.loads((data_dir / "index.json").read_text())["posts"]
+        assert on_disk == {str(n): {"path": f"{n}.md"} for n in range(i + 1)}
+
+    def test_cache_invalidated_when_both_files_change(self, data_dir):
+        """Test that load_index() rereads after index.json and the log change."""
+        write_file(data_dir / "index.json", '{"posts": {"1": {}}}', 1_000_000_000)
+        write_file(utils.INDEX_LOG_PATH, '{"posts": {"2": {}}}\n', 1_000_000_000)
+        assert set(load_index()["posts"]) == {"1", "2"}
+
+        write_file(data_dir / "index.json", '{"posts": {"3": {}}}', 2_000_000_000)
+        write_file(utils.INDEX_LOG_PATH, '{"posts": {"4": {}}}\n', 2_000_000_000)
+        assert set(load_index()["posts"]) == {"3", "4"}
+
+    def test_cache_invalidated_when_log_removed(self, data_dir):
+        """Test that a log deleted behind load_index()'s back is noticed."""
+        write_file(data_dir / "index.json", '{"posts": {"1": {}}}', 1_000_000_000)
+        append_index_entry("2", {})
+        assert set(load_index()["posts"]) == {"1", "2"}
+
+        utils.INDEX_LOG_PATH.unlink()
+        assert set(load_index()["posts"]) == {"1"}
+
+    def test_compact_index_without_log(self, data_dir):
+        """Test that compacting with no log leaves index.json alone."""
+        compact_index()
+        assert not (data_dir / "index.json").exists()
+
+
+class TestJsonFallbacks:
+    """Tests for the JSON helpers with orjson, ujson or the standard library."""
+
+    def test_round_trip(self, json_backend):
+        """Test dumps/loads keep unicode and nesting."""
+        data = {"posts": {"1": {"path": "a/b.md", "tags": ["café", "🚀"]}}, "n": None}
+        assert json_loads(json_dumps(data)) == data
+        assert json_loads(json_dumps(data).decode()) == data
+
+    def test_dumps_options(self, json_backend):
+        """Test sort_keys and stringifying unknown types."""
+        assert json_loads(json_dumps({"d": date(2025, 1, 2)})) == {"d": "2025-01-02"}
+        assert list(json_loads(json_dumps({"b": 1, "a": 2}, sort_keys=True))) == ["a", "b"]
+
+    def test_json_line(self, json_backend):
+        """Test the NDJSON serializer writes one line."""
+        line = utils._json_line({"text": "two\nlines", "path": "a/b"})
+        assert b"\n" not in line
+        assert json_loads(line) == {"text": "two\nlines", "path": "a/b"}
+
+    def test_loads_rejects_bad_json(self, json_backend):
+        """Test that malformed input raises ValueError (the log replay relies on it)."""
+        with pytest.raises(ValueError):
+            json_loads(b'{"posts": {"1": {"pa')
+
+    def test_index_and_tags_files(self, json_backend, data_dir):
+        """Test index and tags files written and read back with each library."""
+        save_index({"posts": {"1": {"path": "a.md"}}})
+        append_index_entry("2", {"path": "b.md"})
+        save_tags({"tags": {"ai": {"2", "1"}}, "topics": {}})
+        utils._data_cache.clear()
+
+        assert load_index()["posts"] == {"1": {"path": "a.md"}, "2": {"path": "b.md"}}
+        assert load_tags()["tags"] == {"ai": {"1", "2"}}
+        assert json.loads((data_dir / "tags.json").read_text())["tags"] == {"ai": ["1", "2"]}
+
+
+class TestMetadataSidecar:
+    """Tests for the .meta.json sidecars caching parsed frontmatter."""
+
+    def write_post(self, path: Path, frontmatter: str, body: str = "Body text."):
+        """Write a post file with the given raw frontmatter."""
+        path.write_text(f"---\n{frontmatter}---\n\n{body}\n")
+
+    def test_sidecar_written_and_reused(self, tmp_path):
+        """Test the sidecar is written on first parse and used afterwards."""
+        post_path = tmp_path / "1.md"
+        self.write_post(post_path, dump_frontmatter({"id": "1", "tags": ["ai"]}))
+        post = parse_post_file(post_path)
+        assert post == {"metadata": {"id": "1", "tags": ["ai"]}, "body": "Body text."}
+
+        sidecar_path = tmp_path / "1.meta.json"
+        sidecar = json.loads(sidecar_path.read_text())
+        assert sidecar["metadata"] == {"id": "1", "tags": ["ai"]}
+
+        # A sidecar whose hash matches is trusted without parsing the YAML
+        sidecar["metadata"]["tags"] = ["from-sidecar"]
+        sidecar_path.write_text(json.dumps(sidecar))
+        assert parse_post_file(post_path)["metadata"]["tags"] == ["from-sidecar"]
+
+    def test_frontmatter_edit_invalidates_sidecar(self, tmp_path):
+        """Test that editing the frontmatter replaces the cached metadata."""
+        post_path = tmp_path / "1.md"
+        self.write_post(post_path, dump_frontmatter({"tags": ["old"]}))
+        parse_post_file(post_path)
+        self.write_post(post_path, dump_frontmatter({"tags": ["new"]}))
+        assert parse_post_file(post_path)["metadata"] == {"tags": ["new"]}
+        assert json.loads((tmp_path / "1.meta.json").read_text())["metadata"] == {"tags": ["new"]}
+
+    def test_body_edit_keeps_sidecar(self, tmp_path):
+        """Test that a body-only edit still uses the sidecar."""
+        post_path = tmp_path / "1.md"
+        self.write_post(post_path, dump_frontmatter({"tags": ["ai"]}))
+        parse_post_file(post_path)
+        self.write_post(post_path, dump_frontmatter({"tags": ["ai"]}), body="New body.")
+        assert parse_post_file(post_path) == {"metadata": {"tags": ["ai"]}, "body": "New body."}
+
+    def test_no_sidecar_for_yaml_only_types(self, tmp_path):
+        """Test metadata that JSON can't hold (a YAML date) skips the sidecar."""
+        post_path = tmp_path / "1.md"
+        self.write_post(post_path, "posted_at: 2025-01-02\n")
+        assert parse_post_file(post_path)["metadata"] == {"posted_at": date(2025, 1, 2)}
+        assert not (tmp_path / "1.meta.json").exists()
+
+    def test_corrupt_sidecar_ignored(self, tmp_path):
+        """Test an unreadable sidecar falls back to parsing the YAML."""
+        post_path = tmp_path / "1.md"
+        self.write_post(post_path, dump_frontmatter({"tags": ["ai"]}))
+        (tmp_path / "1.meta.json").write_text('{"frontmatter_hash": ')
+        assert parse_post_file(post_path)["metadata"] == {"tags": ["ai"]}
+
+    def test_no_frontmatter(self, tmp_path):
+        """Test a file without frontmatter has empty metadata and no sidecar."""
+        post_path = tmp_path / "1.md"
+        post_path.write_text("Just a body.\n")
+        assert parse_post_file(post_path) == {"metadata": {}, "body": "Just a body.\n"}
+        assert not (tmp_path / "1.meta.json").exists()
@@ -6,14 +6,12 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-import yaml
-
 from utils import (
     extract_post_id,
     extract_handle,
+    dump_frontmatter,
     get_post_path,
-    load_index,
-    save_index,
+    append_index_entry,
     load_tags,
     save_tags,
     ARCHIVE_DIR,
@@ -93,17 +91,13 @@ def create_post_file(
             for desc in media_descriptions
         ]
 
-    # Write file with YAML frontmatter
+    # Write file with YAML frontmatter, keeping the fields in the order built above
+    frontmatter = dump_frontmatter(metadata)
     with open(file_path, "w") as f:
-        f.write("---\n")
-        yaml.dump(metadata, f, default_flow_style=False, allow_unicode=True)
-        f.write("---\n\n")
-        f.write(content)
-        f.write("\n")
+        f.write(f"---\n{frontmatter}---\n\n{content}\n")
 
     # Update index
-    index = load_index()
-    index["posts"][post_id] = {
+    entry = {
         "path": str(file_path.relative_to(ARCHIVE_DIR.parent.parent)),
         "author": author_handle,
         "archived_at": archived_at.isoformat(),
@@ -111,19 +105,15 @@ def create_post_file(
         "topics": topics or [],
         "importance": importance,
     }
-    save_index(index)
+    append_index_entry(post_id, entry)
 
     # Update tags
     if tags or topics:
         tag_data = load_tags()
         for tag in (tags or []):
-            if tag not in tag_data["tags"]:
-                tag_data["tags"][tag] = []
-            tag_data["tags"][tag].append(post_id)
+            tag_data["tags"].setdefault(tag, set()).add(post_id)
         for topic in (topics or []):
-            if topic not in tag_data["topics"]:
-                tag_data["topics"][topic] = []
-            tag_data["topics"][topic].append(post_id)
+            tag_data["topics"].setdefault(topic, set()).add(post_id)
         save_tags(tag_data)
 
     return file_path
@@ -191,7 +191,7 @@ def fetch_posts(urls: list[str], delay: float) -> tuple[list, list]:
         print(f"[{i+1}/{len(urls)}] @.../{tweet_id} ", end="", flush=True)
 
         try:
-            thread = fetch_thread(url)
+            thread = fetch_thread(url, tweet_id=tweet_id)
             if thread:
                 successes.append((url, thread))
                 print("OK")
@@ -211,11 +211,12 @@ def fetch_posts(urls: list[str], delay: float) -> tuple[list, list]:
 
 def build_content(thread: Thread) -> str:
     """Build content string from thread."""
-    if thread.total_count > 1:
-        content_parts = []
-        for i, tweet in enumerate(thread.tweets, 1):
-            content_parts.append(f"[{i}/{thread.total_count}]\n{tweet.text}")
-        return "\n\n---\n\n".join(content_parts)
+    total_count = thread.total_count
+    if total_count > 1:
+        return "\n\n---\n\n".join(
+            f"[{i}/{total_count}]\n{tweet.text}"
+            for i, tweet in enumerate(thread.tweets, 1)
+        )
     else:
         return thread.tweets[0].text
 
@@ -297,16 +298,20 @@ def save_posts_to_supabase(posts: list[tuple[str, Thread]], no_embed: bool = Fal
             )
 
             # Insert media items
-            for tweet in thread.tweets:
-                for m in tweet.media:
-                    try:
-                        db.insert_media(
-                            post_id=post_id,
-                            media_type=m.get("type", "image"),
-                            url=m.get("url", ""),
-                        )
-                    except Exception:
-                        pass  # Silently ignore media insertion failures
+            media_items = [
+                {
+                    "post_id": post_id,
+                    "media_type": m.get("type", "image"),
+                    "url": m.get("url", ""),
+                }
+                for tweet in thread.tweets
+                for m in tweet.media
+            ]
+            try:
+                db.insert_media_bulk(media_items)
+            except Exception as e:
+                media_urls = ", ".join(item["url"] for item in media_items)
+                print(f"  Warning: Failed to save media for {post_id}: {e} ({media_urls})")
 
             saved_ids.append(post_id)
             status = "OK" if embedding else "OK (no embedding)"
@@ -2,7 +2,7 @@
 """Export archive in LLM-optimized formats."""
 
 import argparse
-import json
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
@@ -12,11 +12,27 @@ from utils import (
     load_tags,
     parse_post_file,
     format_post_for_llm,
+    json_dumps,
     EXPORTS_DIR,
     BASE_DIR,
 )
 from search import search_posts
 
+# Rendered format_post_for_llm output, keyed by post ID. Grouped exports
+# (by topic) render a post once per group, so reuse it for the whole run.
+_llm_cache: dict[str, str] = {}
+
+
+def render_post(post: dict) -> str:
+    """Format a post for LLM consumption, reusing earlier renders of it."""
+    post_id = post.get("id")
+    if post_id is None:
+        return format_post_for_llm(post)
+    rendered = _llm_cache.get(post_id)
+    if rendered is None:
+        rendered = _llm_cache[post_id] = format_post_for_llm(post)
+    return rendered
+
 
 def export_markdown(
     posts: List[dict],
@@ -39,7 +55,7 @@ def export_markdown(
         for i, post in enumerate(posts, 1):
             meta = post.get("metadata", {})
             author = meta.get("author", {}).get("handle", "unknown")
-            preview = post.get("body", "")[:50].replace("\n", " ") + "..."
+            preview = post["preview"][:50] + "..."
             lines.append(f"{i}. [@{author}] {preview}")
         lines.append("")
         lines.append("---")
@@ -49,7 +65,7 @@ def export_markdown(
     lines.append("")
 
     for post in posts:
-        lines.append(format_post_for_llm(post))
+        lines.append(render_post(post))
         lines.append("")
         lines.append("---")
         lines.append("")
@@ -68,8 +84,8 @@ def export_json(posts: List[dict], output_path: Path):
         "posts": posts,
     }
 
-    with open(output_path, "w") as f:
-        json.dump(export_data, f, indent=2, default=str)
+    with open(output_path, "wb") as f:
+        f.write(json_dumps(export_data))
 
     return output_path
 
@@ -130,13 +146,11 @@ def export_summary(posts: List[dict], output_path: Path):
     ]
 
     # Group by topic
-    by_topic = {}
+    by_topic = defaultdict(list)
     for post in posts:
         meta = post.get("metadata", {})
         topics = meta.get("topics", ["uncategorized"])
         for topic in topics:
-            if topic not in by_topic:
-                by_topic[topic] = []
             by_topic[topic].append(post)
 
     for topic, topic_posts in sorted(by_topic.items()):
@@ -159,12 +173,10 @@ def export_summary(posts: List[dict], output_path: Path):
 
 def export_by_author(posts: List[dict], output_dir: Path):
     """Export posts grouped by author into separate files."""
-    by_author = {}
+    by_author = defaultdict(list)
     for post in posts:
         meta = post.get("metadata", {})
         author = meta.get("author", {}).get("handle", "unknown")
-        if author not in by_author:
-            by_author[author] = []
         by_author[author].append(post)
 
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -182,13 +194,11 @@ def export_by_author(posts: List[dict], output_dir: Path):
 
 def export_by_topic(posts: List[dict], output_dir: Path):
     """Export posts grouped by topic into separate files."""
-    by_topic = {}
+    by_topic = defaultdict(list)
     for post in posts:
         meta = post.get("metadata", {})
         topics = meta.get("topics", ["uncategorized"])
         for topic in topics:
-            if topic not in by_topic:
-                by_topic[topic] = []
             by_topic[topic].append(post)
 
     output_dir.mkdir(parents=True, exist_ok=True)
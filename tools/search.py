@@ -2,18 +2,23 @@
 """Search and retrieve posts from the archive."""
 
 import argparse
-import json
 import re
+import sqlite3
 import sys
-from datetime import datetime
+from collections import Counter
 from pathlib import Path
 from typing import List, Optional
 
 from utils import (
     load_index,
+    load_index_lazy,
     load_tags,
+    get_archive_db,
+    split_frontmatter,
+    load_post_metadata,
     parse_post_file,
     format_post_for_llm,
+    json_dumps,
     ARCHIVE_DIR,
     BASE_DIR,
 )
@@ -21,6 +26,17 @@ from utils import (
 # Add src to path for embedding imports
 sys.path.insert(0, str(BASE_DIR))
 
+# Characters of body text shown in summary listings
+PREVIEW_LENGTH = 100
+
+
+def make_preview(body: str, length: int = PREVIEW_LENGTH) -> str:
+    """Single-line preview of a post body, with an ellipsis if truncated."""
+    preview = body[:length].replace("\n", " ")
+    if len(body) > length:
+        preview += "..."
+    return preview
+
 
 def semantic_search(query: str, limit: int = 10) -> List[dict]:
     """Search posts using semantic similarity."""
@@ -30,21 +46,23 @@ def semantic_search(query: str, limit: int = 10) -> List[dict]:
     results = vector_store.search(query, n_results=limit)
 
     # Convert to format matching keyword search results
+    index_posts = load_index_lazy().get("posts", {})
     formatted = []
     for result in results:
         # Load full post data for consistent output
         post_id = result["id"]
-        index = load_index()
-        post_info = index.get("posts", {}).get(post_id, {})
+        post_info = index_posts.get(post_id, {})
 
         post_path = BASE_DIR / post_info.get("path", "")
         if post_path.exists():
             post = parse_post_file(post_path)
+            body = post.get("body", result["content"])
             formatted.append({
                 "id": post_id,
                 "path": str(post_path),
                 "metadata": post.get("metadata", {}),
-                "body": post.get("body", result["content"]),
+                "body": body,
+                "preview": make_preview(body),
                 "similarity": result["similarity"],
             })
         else:
@@ -54,12 +72,104 @@ def semantic_search(query: str, limit: int = 10) -> List[dict]:
                 "path": "",
                 "metadata": result["metadata"],
                 "body": result["content"],
+                "preview": make_preview(result["content"]),
                 "similarity": result["similarity"],
             })
 
     return formatted
 
 
+def _side_index() -> Optional[sqlite3.Connection]:
+    """The up-to-date side index (see get_archive_db()), or None if it is unavailable."""
+    try:
+        return get_archive_db()
+    except sqlite3.Error:
+        return None
+
+
+def _tagged_ids(
+    db: Optional[sqlite3.Connection], kind: str, wanted: List[str]
+) -> Optional[set]:
+    """
+    Union of the post IDs filed under any of the wanted tags or topics.
+
+    Args:
+        db: Side index connection from _side_index()
+        kind: "tag" or "topic"
+        wanted: Names to match, case-insensitively
+
+    Returns:
+        Set of post IDs, looked up in the side index's post_tags table, or
+        None when the side index is unavailable (no narrowing)
+    """
+    if db is None:
+        return None
+    wanted = {w.lower() for w in wanted}
+    try:
+        rows = db.execute(
+            "SELECT DISTINCT post_id FROM post_tags WHERE kind = ? AND name IN (%s)"
+            % ", ".join("?" * len(wanted)),
+            (kind, *wanted),
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+    return {row[0] for row in rows}
+
+
+def _author_ids(db: Optional[sqlite3.Connection], author: str) -> Optional[set]:
+    """
+    IDs of posts whose author handle contains the given handle, case-insensitively.
+
+    Matches the handles the side index read from the post frontmatter.
+    Returns None when the side index is unavailable.
+    """
+    if db is None:
+        return None
+    author = author.lower()
+    try:
+        rows = db.execute("SELECT post_id, author FROM posts").fetchall()
+    except sqlite3.Error:
+        return None
+    return {post_id for post_id, handle in rows if handle and author in handle.lower()}
+
+
+def _importance_ids(db: Optional[sqlite3.Connection], importance: str) -> Optional[set]:
+    """IDs of posts with the given importance, or None when the side index is unavailable."""
+    if db is None:
+        return None
+    try:
+        rows = db.execute(
+            "SELECT post_id FROM posts WHERE importance = ?", (importance,)
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+    return {row[0] for row in rows}
+
+
+def _text_match_ids(db: Optional[sqlite3.Connection], query: str) -> Optional[set]:
+    """
+    IDs of posts whose body or notes may contain the query, from the FTS index.
+
+    Every whitespace-free piece of the query must appear within the body or the
+    notes, so those pieces narrow the candidates; the substring check still runs.
+    Returns None when the index can't help (no piece long enough for trigrams,
+    or the side index is unavailable).
+    """
+    terms = [t for t in query.split() if len(t) >= 3]
+    if db is None or not terms:
+        return None
+    expression = " AND ".join(
+        '{body notes} : "' + term.replace('"', '""') + '"' for term in terms
+    )
+    try:
+        rows = db.execute(
+            "SELECT post_id FROM post_fts WHERE post_fts MATCH ?", (expression,)
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+    return {row[0] for row in rows}
+
+
 def search_posts(
     query: str = None,
     tags: List[str] = None,
@@ -69,73 +179,130 @@ def search_posts(
     date_from: str = None,
     date_to: str = None,
     limit: int = None,
+    with_body: bool = True,
 ) -> List[dict]:
-    """Search posts by various criteria."""
+    """
+    Search posts by various criteria.
+
+    Every result carries a short ``preview`` of its body. Pass
+    ``with_body=False`` to leave out the full ``body`` when only the
+    preview is displayed.
+    """
     index = load_index()
     results = []
 
-    for post_id, post_info in index.get("posts", {}).items():
+    # Filters narrow the candidates from the side index, brought up to
+    # date once for this search
+    db = _side_index() if (query or tags or topics or author or importance) else None
+
+    # Tag/topic filters only need to visit the posts filed under them, so
+    # intersect those before reading any post files.
+    candidates = None
+    if tags:
+        candidates = _tagged_ids(db, "tag", tags)
+    if topics:
+        topic_ids = _tagged_ids(db, "topic", topics)
+        if topic_ids is not None:
+            candidates = topic_ids if candidates is None else candidates & topic_ids
+
+    # Author and importance filters narrow from the side index's columns
+    if author:
+        author_ids = _author_ids(db, author)
+        if author_ids is not None:
+            candidates = author_ids if candidates is None else candidates & author_ids
+    if importance:
+        importance_ids = _importance_ids(db, importance)
+        if importance_ids is not None:
+            candidates = (
+                importance_ids if candidates is None else candidates & importance_ids
+            )
+
+    # Text queries likewise only need the posts the full-text index matches
+    if query:
+        text_ids = _text_match_ids(db, query)
+        if text_ids is not None:
+            candidates = text_ids if candidates is None else candidates & text_ids
+
+    # Lowercase the search terms once rather than for every post
+    query_lower = query.lower() if query else query
+    author_lower = author.lower() if author else author
+    wanted_tags = {t.lower() for t in tags} if tags else None
+    wanted_topics = {t.lower() for t in topics} if topics else None
+
+    posts = index.get("posts", {})
+    if candidates is None:
+        entries = posts.items()
+    else:
+        entries = [(pid, posts[pid]) for pid in posts if pid in candidates]
+
+    for post_id, post_info in entries:
         # Load full post
         post_path = BASE_DIR / post_info["path"]
         if not post_path.exists():
             continue
 
-        post = parse_post_file(post_path)
-        meta = post.get("metadata", {})
-        content = post.get("body", "")
+        with open(post_path) as f:
+            frontmatter, content = split_frontmatter(f.read())
+
+        # A text query is checked against body + notes. Without a notes key
+        # the body decides, so a non-matching post needs no YAML parsing.
+        if (
+            query
+            and "notes" not in (frontmatter or "")
+            and query_lower not in f"{content} ".lower()
+        ):
+            continue
+
+        meta = load_post_metadata(post_path, frontmatter)
+
+        # Filter by importance
+        if importance:
+            if meta.get("importance") != importance:
+                continue
 
         # Filter by author
         if author:
-            post_author = meta.get("author", {}).get("handle", "")
-            if author.lower() not in post_author.lower():
+            post_author = (meta.get("author") or {}).get("handle") or ""
+            if author_lower not in post_author.lower():
                 continue
 
         # Filter by tags
         if tags:
-            post_tags = [t.lower() for t in meta.get("tags", [])]
-            if not any(t.lower() in post_tags for t in tags):
+            if wanted_tags.isdisjoint(t.lower() for t in meta.get("tags", [])):
                 continue
 
         # Filter by topics
         if topics:
-            post_topics = [t.lower() for t in meta.get("topics", [])]
-            if not any(t.lower() in post_topics for t in topics):
-                continue
-
-        # Filter by importance
-        if importance:
-            if meta.get("importance") != importance:
+            if wanted_topics.isdisjoint(t.lower() for t in meta.get("topics", [])):
                 continue
 
-        # Filter by date range
+        # Filter by date range. ISO-8601 timestamps sort lexicographically,
+        # so the bounds (YYYY-MM-DD) compare directly against the stored strings.
         if date_from or date_to:
             post_date = meta.get("archived_at", meta.get("posted_at", ""))
             if post_date:
-                try:
-                    post_dt = datetime.fromisoformat(post_date.replace("Z", "+00:00"))
-                    if date_from:
-                        from_dt = datetime.fromisoformat(date_from)
-                        if post_dt < from_dt:
-                            continue
-                    if date_to:
-                        to_dt = datetime.fromisoformat(date_to)
-                        if post_dt > to_dt:
-                            continue
-                except ValueError:
-                    pass
+                if not isinstance(post_date, str):
+                    post_date = post_date.isoformat()
+                if date_from and post_date < date_from:
+                    continue
+                if date_to and post_date > date_to:
+                    continue
 
         # Text search in content
         if query:
             search_text = f"{content} {meta.get('notes', '')}".lower()
-            if query.lower() not in search_text:
+            if query_lower not in search_text:
                 continue
 
-        results.append({
+        result = {
             "id": post_id,
             "path": str(post_path),
             "metadata": meta,
-            "body": content,
-        })
+            "preview": make_preview(content),
+        }
+        if with_body:
+            result["body"] = content
+        results.append(result)
 
     # Sort by archived date (newest first)
     results.sort(
@@ -166,14 +333,14 @@ def list_tags():
 def list_authors():
     """List all authors and their post counts."""
     index = load_index()
-    authors = {}
-    for post_id, post_info in index.get("posts", {}).items():
-        author = post_info.get("author", "unknown")
-        authors[author] = authors.get(author, 0) + 1
+    authors = Counter(
+        post_info.get("author", "unknown")
+        for post_info in index.get("posts", {}).values()
+    )
 
     print("\n[Authors]")
     print("-" * 30)
-    for author, count in sorted(authors.items(), key=lambda x: -x[1]):
+    for author, count in authors.most_common():
         print(f"  @{author}: {count} posts")
 
 
@@ -204,11 +371,7 @@ def display_results(results: List[dict], format: str = "summary", show_similarit
             print(f"{i}.{similarity_str} @{author_handle}")
             print(f"   ID: {post['id']}")
 
-            # Truncate content for summary
-            content_preview = post["body"][:100].replace("\n", " ")
-            if len(post["body"]) > 100:
-                content_preview += "..."
-            print(f"   {content_preview}")
+            print(f"   {post['preview']}")
 
             if meta.get("tags"):
                 print(f"   Tags: {', '.join(meta['tags'])}")
@@ -222,12 +385,12 @@ def display_results(results: List[dict], format: str = "summary", show_similarit
             print()
 
         elif format == "json":
-            print(json.dumps(post, indent=2, default=str))
+            print(json_dumps(post).decode())
 
 
 def get_post(post_id: str) -> Optional[dict]:
     """Get a single post by ID."""
-    index = load_index()
+    index = load_index_lazy()
     if post_id not in index.get("posts", {}):
         return None
 
@@ -315,6 +478,7 @@ def main():
                 date_from=args.date_from,
                 date_to=args.date_to,
                 limit=args.limit,
+                with_body=args.format != "summary",
             )
             display_results(results, args.format)
 
@@ -322,7 +486,7 @@ def main():
         post = get_post(args.post_id)
         if post:
             if args.format == "json":
-                print(json.dumps(post, indent=2, default=str))
+                print(json_dumps(post).decode())
             else:
                 print(format_post_for_llm(post))
         else:
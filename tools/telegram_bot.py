@@ -20,9 +20,14 @@ import os
 import re
 import sys
 import html
+import asyncio
+import functools
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
 
 # Load environment variables from .env file if present
 try:
@@ -54,7 +59,7 @@ from telegram.ext import (
 sys.path.insert(0, str(Path(__file__).parent.parent))  # For src/
 sys.path.insert(0, str(Path(__file__).parent))  # For twitter_fetcher
 
-from twitter_fetcher import fetch_thread, extract_tweet_id, Thread
+from twitter_fetcher import fetch_thread_async, extract_tweet_id, Thread
 from src.supabase.client import get_supabase_client, SupabaseClient
 from src.embeddings.service import get_embedding_service, EmbeddingService
 from src.vision import get_image_extractor, ImageExtractor
@@ -75,6 +80,17 @@ _image_extractor: ImageExtractor = None
 ENABLE_IMAGE_EXTRACTION = os.environ.get("ENABLE_IMAGE_EXTRACTION", "true").lower() == "true"
 MAX_IMAGES_TO_EXTRACT = int(os.environ.get("MAX_IMAGES_TO_EXTRACT", "4"))
 
+# Shared post URLs on X/Twitter or a mirror host
+_SHARE_URL_RE = re.compile(
+    r'https?://(?:twitter|x|fxtwitter|vxtwitter)\.com/(?P<handle>\w+)/status/(?P<id>\d+)'
+)
+
+# One comma-separated item, without surrounding whitespace
+_CSV_ITEM_RE = re.compile(r'[^,\s][^,]*[^,\s]|[^,\s]')
+
+# Characters html.escape() would replace
+_HTML_SPECIAL_RE = re.compile(r'[&<>"\']')
+
 
 def get_db() -> SupabaseClient:
     """Get the Supabase client (lazy singleton)."""
@@ -106,16 +122,84 @@ def get_vision() -> ImageExtractor:
 
 def escape_html_text(text: str) -> str:
     """Escape text for Telegram HTML parse mode."""
+    # Handles and tags rarely need escaping; skip the replace passes then
+    if not _HTML_SPECIAL_RE.search(text):
+        return text
     return html.escape(text)
 
 
-def check_duplicate_supabase(post_id: str) -> bool:
+@functools.lru_cache(maxsize=512)
+def _embed_query_cached(query: str) -> tuple[float, ...]:
+    """Embed a normalized search query, memoized so repeat searches skip the model."""
+    return tuple(get_embeddings().generate_for_query(query))
+
+
+def embed_query(query: str) -> list[float]:
+    """Get the embedding for a search query."""
+    # The BGE tokenizer is uncased and splits on whitespace, so queries that
+    # differ only in case or spacing embed identically and share a cache entry.
+    return list(_embed_query_cached(" ".join(query.lower().split())))
+
+
+# Recently checked post IDs -> archived?  Posts are never un-archived by
+# the bot, so entries only need size-based eviction.
+_dup_cache: "OrderedDict[str, bool]" = OrderedDict()
+DUP_CACHE_MAX = 4096
+
+
+def remember_archived(post_id: str, archived: bool = True):
+    """Record a post's archived status in the duplicate-check cache."""
+    _dup_cache[post_id] = archived
+    _dup_cache.move_to_end(post_id)
+    if len(_dup_cache) > DUP_CACHE_MAX:
+        _dup_cache.popitem(last=False)
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call (Supabase, embedding model, HTTP) in a worker thread."""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def check_duplicate_supabase(post_id: str) -> bool:
     """Check if a post already exists in Supabase."""
+    cached = _dup_cache.get(post_id)
+    if cached is not None:
+        _dup_cache.move_to_end(post_id)
+        return cached
     try:
-        return get_db().post_exists(post_id)
+        exists = await run_blocking(get_db().post_exists, post_id)
     except Exception as e:
         logger.warning(f"Failed to check duplicate in Supabase: {e}")
         return False
+    remember_archived(post_id, exists)
+    return exists
+
+
+# Persistent cache of fetched threads by post ID; tweets don't change once posted
+THREAD_CACHE_MAX = 1000
+THREAD_CACHE_TTL = 6 * 3600  # seconds
+_thread_cache: OrderedDict = OrderedDict()  # post_id -> (stored_at, thread); event loop only
+
+
+def get_cached_thread(post_id: str) -> Thread:
+    """Get a previously fetched thread, or None if missing or expired."""
+    entry = _thread_cache.get(post_id)
+    if entry is None:
+        return None
+    stored_at, thread = entry
+    if time.monotonic() - stored_at > THREAD_CACHE_TTL:
+        del _thread_cache[post_id]
+        return None
+    _thread_cache.move_to_end(post_id)
+    return thread
+
+
+def cache_thread(post_id: str, thread: Thread):
+    """Store a fetched thread, evicting the least recently used beyond the size limit."""
+    _thread_cache[post_id] = (time.monotonic(), thread)
+    _thread_cache.move_to_end(post_id)
+    if len(_thread_cache) > THREAD_CACHE_MAX:
+        _thread_cache.popitem(last=False)
 
 
 # Conversation states
@@ -128,6 +212,11 @@ BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 ALLOWED_USERS = os.environ.get("ALLOWED_TELEGRAM_USERS", "").split(",")
 ALLOWED_USERS = [int(uid.strip()) for uid in ALLOWED_USERS if uid.strip()]
 
+# Webhook mode (optional): receive updates at this public HTTPS URL instead of polling
+WEBHOOK_URL = os.environ.get("TELEGRAM_WEBHOOK_URL")
+WEBHOOK_PORT = int(os.environ.get("TELEGRAM_WEBHOOK_PORT", "8443"))
+WEBHOOK_SECRET = os.environ.get("TELEGRAM_WEBHOOK_SECRET")
+
 
 def is_allowed(user_id: int) -> bool:
     """Check if user is allowed to use the bot."""
@@ -176,7 +265,7 @@ async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     try:
-        db_stats = get_db().get_stats()
+        db_stats = await run_blocking(get_db().get_stats)
         post_count = db_stats.get("total_posts", 0)
         author_count = db_stats.get("unique_authors", 0)
         tag_count = db_stats.get("unique_tags", 0)
@@ -201,7 +290,9 @@ async def recent(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     try:
-        posts = get_db().get_recent_posts(limit=5)
+        posts = await run_blocking(
+            get_db().get_recent_posts, limit=5, columns="author_handle,tags"
+        )
 
         if not posts:
             await update.message.reply_text("No posts archived yet!")
@@ -210,8 +301,8 @@ async def recent(update: Update, context: ContextTypes.DEFAULT_TYPE):
         lines = ["📝 <b>Recent Archives:</b>\n"]
         for post in posts:
             author = escape_html_text(post.get("author_handle", "unknown"))
-            tags_list = post.get("tags", []) or []
-            tags = escape_html_text(", ".join(tags_list[:3])) if tags_list else "no tags"
+            tags_list = post.get("tags") or ()
+            tags = escape_html_text(", ".join(tags_list[:3])) or "no tags"
             lines.append(f"• @{author} - {tags}")
 
         await update.message.reply_text("\n".join(lines), parse_mode="HTML")
@@ -247,10 +338,11 @@ async def semantic_search(update: Update, query: str):
     """Perform semantic search using vector similarity."""
     try:
         # Generate query embedding
-        query_embedding = get_embeddings().generate_for_query(query)
+        query_embedding = await run_blocking(embed_query, query)
 
         # Search in Supabase
-        results = get_db().search_posts(
+        results = await run_blocking(
+            get_db().search_posts,
             query_embedding=query_embedding,
             match_threshold=0.5,  # Lower threshold for more results
             match_count=10
@@ -272,8 +364,8 @@ async def semantic_search(update: Update, query: str):
             sim_pct = int(similarity * 100)
 
             # Get tags if available
-            tags_list = post.get("tags", []) or []
-            tags = escape_html_text(", ".join(tags_list[:2])) if tags_list else ""
+            tags_list = post.get("tags") or ()
+            tags = escape_html_text(", ".join(tags_list[:2]))
 
             # Format: author (score%) - tags
             if tags:
@@ -307,8 +399,7 @@ async def handle_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message_text = update.message.text
 
     # Extract URL from message
-    url_pattern = r'https?://(?:twitter|x|fxtwitter|vxtwitter)\.com/\w+/status/\d+'
-    match = re.search(url_pattern, message_text)
+    match = _SHARE_URL_RE.search(message_text)
 
     if not match:
         await update.message.reply_text(
@@ -317,13 +408,19 @@ async def handle_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return ConversationHandler.END
 
-    url = match.group(0)
     # Normalize URL to x.com
-    url = re.sub(r'(fxtwitter|vxtwitter|twitter)', 'x', url)
-
-    # Check for duplicate in Supabase
-    post_id = extract_tweet_id(url)
-    if post_id and check_duplicate_supabase(post_id):
+    post_id = match["id"]
+    url = f"https://x.com/{match['handle']}/status/{post_id}"
+
+    # Start fetching the thread (unless cached) while checking for a duplicate
+    # in Supabase; most shared URLs are new, so the check's round-trip is hidden.
+    cached_thread = get_cached_thread(post_id)
+    fetch_task = None
+    if cached_thread is None:
+        fetch_task = asyncio.create_task(fetch_thread_async(url, tweet_id=post_id))
+    if await check_duplicate_supabase(post_id):
+        if fetch_task:
+            fetch_task.cancel()
         await update.message.reply_text(
             "⚠️ This post is already in your archive!\n\n"
             "Send me a different link, or search with /search"
@@ -333,7 +430,12 @@ async def handle_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("🔍 Fetching thread...")
 
     # Fetch the thread
-    thread = fetch_thread(url)
+    if fetch_task:
+        thread = await fetch_task
+        if thread:
+            cache_thread(post_id, thread)
+    else:
+        thread = cached_thread
 
     if not thread:
         await update.message.reply_text(
@@ -348,11 +450,10 @@ async def handle_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Store thread in context
     context.user_data["thread"] = thread
     context.user_data["url"] = url
+    context.user_data["post_id"] = post_id
 
     # Format preview
-    preview = thread.full_text
-    if len(preview) > 500:
-        preview = preview[:500] + "..."
+    preview = thread.preview(500)
 
     thread_info = ""
     if thread.total_count > 1:
@@ -399,7 +500,7 @@ async def confirm_content(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data["notes"] = None
 
         try:
-            file_path = save_archived_post(context.user_data)
+            file_path = await save_archived_post(context.user_data)
             thread = context.user_data["thread"]
 
             await query.edit_message_text(
@@ -428,6 +529,11 @@ async def confirm_content(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ADD_TAGS
 
 
+def parse_csv(text: str) -> list[str]:
+    """Split comma-separated user input into trimmed, lowercased items."""
+    return [m.group(0).lower() for m in _CSV_ITEM_RE.finditer(text)]
+
+
 async def add_tags(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle tags input."""
     text = update.message.text.strip()
@@ -435,8 +541,7 @@ async def add_tags(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if text.lower() in ["/skip", "skip", "s"]:
         context.user_data["tags"] = []
     else:
-        tags = [t.strip().lower() for t in text.split(",") if t.strip()]
-        context.user_data["tags"] = tags
+        context.user_data["tags"] = parse_csv(text)
 
     await update.message.reply_text(
         "📚 <b>Add Topics</b>\n\n"
@@ -455,8 +560,7 @@ async def add_topics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if text.lower() in ["/skip", "skip", "s"]:
         context.user_data["topics"] = []
     else:
-        topics = [t.strip().lower() for t in text.split(",") if t.strip()]
-        context.user_data["topics"] = topics
+        context.user_data["topics"] = parse_csv(text)
 
     await update.message.reply_text(
         "📝 <b>Add Notes</b>\n\n"
@@ -481,7 +585,7 @@ async def add_notes(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Save the post
     try:
-        file_path = save_archived_post(context.user_data)
+        file_path = await save_archived_post(context.user_data)
         thread = context.user_data["thread"]
 
         await update.message.reply_text(
@@ -502,72 +606,92 @@ async def add_notes(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
-def save_archived_post(data: dict) -> str:
+def generate_embedding(text: str, post_id: str) -> list[float]:
+    """Embed post text, returning None if the embedding service fails."""
+    try:
+        embedding = get_embeddings().generate(text)
+        logger.info(f"Generated embedding for post {post_id}")
+        return embedding
+    except Exception as e:
+        logger.error(f"Failed to generate embedding: {e}")
+        return None
+
+
+async def save_archived_post(data: dict) -> str:
     """Save the post to Supabase with embedding."""
     thread: Thread = data["thread"]
     url = data["url"]
 
-    post_id = extract_tweet_id(url)
+    post_id = data.get("post_id") or extract_tweet_id(url)
     archived_at = datetime.now()
+    author_handle = thread.author_handle
+    total_count = thread.total_count
+    tags = data.get("tags") or []
+    topics = data.get("topics") or []
+    notes = data.get("notes")
 
     # Build content - combine thread if multiple posts
-    if thread.total_count > 1:
-        content_parts = []
-        for i, tweet in enumerate(thread.tweets, 1):
-            content_parts.append(f"[{i}/{thread.total_count}]\n{tweet.text}")
-        content = "\n\n---\n\n".join(content_parts)
+    if total_count > 1:
+        content = "\n\n---\n\n".join(
+            f"[{i}/{total_count}]\n{tweet.text}"
+            for i, tweet in enumerate(thread.tweets, 1)
+        )
     else:
         content = thread.tweets[0].text
 
+    # Build embedding text (content + metadata for better search)
+    embed_parts = [content]
+    if author_handle:
+        embed_parts.append(f"\n\nAuthor: @{author_handle}")
+    if tags:
+        embed_parts.append(f"\nTags: {', '.join(tags)}")
+    if topics:
+        embed_parts.append(f"\nTopics: {', '.join(topics)}")
+    if notes:
+        embed_parts.append(f"\nNotes: {notes}")
+
     # Extract image descriptions if enabled
     image_descriptions = []
     image_extraction_results = {}  # url -> {description, category, extraction_model}
-
+    image_urls = []
     if ENABLE_IMAGE_EXTRACTION:
-        extractor = get_vision()
+        image_urls = [
+            m["url"]
+            for tweet in thread.tweets
+            for m in tweet.media
+            if m.get("type") == "image" and m.get("url")
+        ][:MAX_IMAGES_TO_EXTRACT]
+
+    if image_urls:
+        extractor = await run_blocking(get_vision)
         if extractor:
-            images_processed = 0
-            for tweet in thread.tweets:
-                for m in tweet.media:
-                    if images_processed >= MAX_IMAGES_TO_EXTRACT:
-                        break
-                    if m.get("type") == "image" and m.get("url"):
-                        try:
-                            logger.info(f"Extracting description for image: {m.get('url')[:50]}...")
-                            result = extractor.describe_image(
-                                image_url=m.get("url"),
-                                post_context=content[:500],  # First 500 chars as context
-                            )
-                            if result and result.get("description"):
-                                image_extraction_results[m.get("url")] = result
-                                image_descriptions.append(result["description"])
-                                images_processed += 1
-                                logger.info(f"Extracted {result['category']} description for image")
-                        except Exception as e:
-                            logger.warning(f"Image extraction failed: {e}")
-
-    # Build embedding text (content + metadata for better search)
-    embed_text = content
-    if thread.author_handle:
-        embed_text += f"\n\nAuthor: @{thread.author_handle}"
-    if data.get("tags"):
-        embed_text += f"\nTags: {', '.join(data['tags'])}"
-    if data.get("topics"):
-        embed_text += f"\nTopics: {', '.join(data['topics'])}"
-    if data.get("notes"):
-        embed_text += f"\nNotes: {data['notes']}"
-
-    # Add image descriptions to embedding text
+            # Describe all images concurrently; each call is a blocking API round-trip
+            post_context = content[:500]  # First 500 chars as context
+            logger.info(f"Extracting descriptions for {len(image_urls)} images...")
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        extractor.describe_image,
+                        image_url=image_url,
+                        post_context=post_context,
+                    )
+                    for image_url in image_urls
+                ),
+                return_exceptions=True,
+            )
+            for image_url, result in zip(image_urls, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Image extraction failed: {result}")
+                elif result and result.get("description"):
+                    image_extraction_results[image_url] = result
+                    image_descriptions.append(result["description"])
+                    logger.info(f"Extracted {result['category']} description for image")
+
+    # Add image descriptions to embedding text, then embed once
     if image_descriptions:
-        embed_text += f"\n\nImage content: {' | '.join(image_descriptions)}"
-
-    # Generate embedding
-    try:
-        embedding = get_embeddings().generate(embed_text)
-        logger.info(f"Generated embedding for post {post_id}")
-    except Exception as e:
-        logger.error(f"Failed to generate embedding: {e}")
-        embedding = None
+        embed_parts.append(f"\n\nImage content: {' | '.join(image_descriptions)}")
+    embed_text = "".join(embed_parts)
+    embedding = await asyncio.to_thread(generate_embedding, embed_text, post_id)
 
     # Handle quoted tweet
     quoted_post_id = None
@@ -582,32 +706,40 @@ def save_archived_post(data: dict) -> str:
             quoted_text = tweet.quoted_tweet.text[:200] if tweet.quoted_tweet.text else None
             break
 
-    # Parse posted_at date
-    posted_at = None
-    if thread.tweets[0].created_at:
-        try:
-            # Handle various date formats
-            posted_at_str = thread.tweets[0].created_at
-            if isinstance(posted_at_str, str):
-                posted_at = posted_at_str  # Let Supabase handle ISO format
-        except Exception:
-            posted_at = None
-
-    # Insert into Supabase
-    db = get_db()
-    db.insert_post(
+    # posted_at is passed through as-is; Supabase parses the date string
+    created_at = thread.tweets[0].created_at
+    posted_at = created_at if isinstance(created_at, str) and created_at else None
+
+    # Media items with extraction results
+    media_rows = []
+    for tweet in thread.tweets:
+        for m in tweet.media:
+            media_url = m.get("url", "")
+            extraction = image_extraction_results.get(media_url, {})
+            media_rows.append({
+                "media_type": m.get("type", "image"),
+                "url": media_url,
+                "category": extraction.get("category"),
+                "description": extraction.get("description"),
+                "extraction_model": extraction.get("extraction_model"),
+            })
+
+    # Insert the post and its media into Supabase in one transaction
+    await run_blocking(
+        get_db().insert_post_with_media,
+        media=media_rows,
         post_id=post_id,
         url=url,
         content=content,
-        author_handle=thread.author_handle,
+        author_handle=author_handle,
         author_name=thread.author_name,
         posted_at=posted_at,
         archived_at=archived_at,
         archived_via="telegram",
-        tags=data.get("tags", []),
-        topics=data.get("topics", []),
-        notes=data.get("notes"),
-        is_thread=thread.total_count > 1,
+        tags=tags,
+        topics=topics,
+        notes=notes,
+        is_thread=total_count > 1,
         quoted_post_id=quoted_post_id,
         quoted_text=quoted_text,
         quoted_author=quoted_author,
@@ -615,27 +747,24 @@ def save_archived_post(data: dict) -> str:
         embedding=embedding,
     )
     logger.info(f"Saved post {post_id} to Supabase")
-
-    # Insert media items with extraction results
-    for tweet in thread.tweets:
-        for m in tweet.media:
-            try:
-                media_url = m.get("url", "")
-                extraction = image_extraction_results.get(media_url, {})
-                db.insert_media(
-                    post_id=post_id,
-                    media_type=m.get("type", "image"),
-                    url=media_url,
-                    category=extraction.get("category"),
-                    description=extraction.get("description"),
-                    extraction_model=extraction.get("extraction_model"),
-                )
-            except Exception as e:
-                logger.warning(f"Failed to insert media for {post_id}: {e}")
+    remember_archived(post_id)
 
     return post_id
 
 
+async def prewarm(application: Application) -> None:
+    """Initialize the Supabase client, embedding model, and vision client at startup."""
+    results = await asyncio.gather(
+        asyncio.to_thread(get_db),
+        asyncio.to_thread(get_embeddings),
+        asyncio.to_thread(get_vision),
+        return_exceptions=True,
+    )
+    for name, result in zip(("Supabase client", "embedding model", "image extractor"), results):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to prewarm {name}: {result}")
+
+
 def main():
     """Start the bot."""
     if not BOT_TOKEN:
@@ -650,7 +779,7 @@ def main():
         return
 
     # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = Application.builder().token(BOT_TOKEN).post_init(prewarm).build()
 
     # Conversation handler for archiving flow
     conv_handler = ConversationHandler(
@@ -674,6 +803,19 @@ def main():
     application.add_handler(CommandHandler("search", search))
     application.add_handler(conv_handler)
 
+    if WEBHOOK_URL:
+        # Requires python-telegram-bot[webhooks]
+        print(f"🤖 Bot is running (webhook on port {WEBHOOK_PORT})! Press Ctrl+C to stop.")
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=WEBHOOK_PORT,
+            url_path=urlparse(WEBHOOK_URL).path.lstrip("/"),
+            webhook_url=WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        return
+
     # Start polling
     print("🤖 Bot is running! Press Ctrl+C to stop.")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
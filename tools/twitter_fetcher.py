@@ -10,11 +10,17 @@ Uses FxTwitter/FixupX API which provides:
 
 import re
 import time
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
 from typing import Optional, List
 from dataclasses import dataclass, field
 from urllib.parse import urlparse
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +30,86 @@ FXTWITTER_API = "https://api.fxtwitter.com"
 # Fallback: vxtwitter
 VXTWITTER_API = "https://api.vxtwitter.com"
 
+# Post URLs on X/Twitter and its mirrors: <user>/status/<id> or i/web/status/<id>
+_TWEET_ID_RE = re.compile(
+    r'(?:twitter|x|fxtwitter|vxtwitter|fixupx)\.com/(?:i/web|\w+)/status/(\d+)'
+)
+_HANDLE_RE = re.compile(r'(?:twitter|x|fxtwitter|vxtwitter)\.com/(\w+)/status/')
+
+# Pause between parent-tweet requests when walking up a thread
+PARENT_FETCH_DELAY = 0.2
+
+REQUEST_TIMEOUT = 10
+
+# Retries for transient API failures (rate limits, gateway errors, dropped connections)
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# In-process cache of API responses by (source, tweet ID); tweets don't change once posted
+RESPONSE_CACHE_MAX = 512
+RESPONSE_CACHE_TTL = 3600  # seconds
+_response_cache: OrderedDict = OrderedDict()  # (source, tweet_id) -> (stored_at, data)
+_response_cache_lock = threading.Lock()
+
+# Shared HTTP clients (lazy singletons) so API calls reuse keep-alive connections
+_session: Optional[requests.Session] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_session() -> requests.Session:
+    """Get the shared HTTP session for API calls."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+            ),
+        ))
+    return _session
+
+
+def _cached_response(source: str, tweet_id: str) -> Optional[dict]:
+    """Get a cached API response, or None if missing or expired."""
+    key = (source, str(tweet_id))
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if time.monotonic() - stored_at > RESPONSE_CACHE_TTL:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return data
+
+
+def _cache_response(source: str, tweet_id: str, data: dict):
+    """Cache an API response, evicting the least recently used beyond the size limit."""
+    key = (source, str(tweet_id))
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), data)
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for API calls (bound to one event loop)."""
+    global _async_client
+    if _async_client is None:
+        # httpx transport retries cover connection failures only
+        _async_client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(retries=MAX_RETRIES),
+        )
+    return _async_client
+
 
 @dataclass
 class Tweet:
@@ -55,35 +141,43 @@ class Thread:
     def main_tweet(self) -> Tweet:
         return self.tweets[0] if self.tweets else None
 
+    def _text_parts(self):
+        """Tweet texts as they appear in full_text, numbered for multi-tweet threads."""
+        count = len(self.tweets)
+        if count == 1:
+            yield self.tweets[0].text
+            return
+        for i, tweet in enumerate(self.tweets, 1):
+            yield f"[{i}/{count}] {tweet.text}"
+
     @property
     def full_text(self) -> str:
         """Combine all tweets into full thread text."""
+        return "\n\n".join(self._text_parts())
+
+    def preview(self, limit: int = 500) -> str:
+        """The start of full_text, truncated to limit characters with an ellipsis."""
+        # Only join as many tweets as the preview can show
         parts = []
-        for i, tweet in enumerate(self.tweets, 1):
-            if len(self.tweets) > 1:
-                parts.append(f"[{i}/{len(self.tweets)}] {tweet.text}")
-            else:
-                parts.append(tweet.text)
-        return "\n\n".join(parts)
+        length = -2  # no separator before the first part
+        for part in self._text_parts():
+            parts.append(part)
+            length += len(part) + 2
+            if length > limit:
+                break
+        text = "\n\n".join(parts)
+        return text[:limit] + "..." if len(text) > limit else text
 
 
 def extract_tweet_id(url: str) -> Optional[str]:
     """Extract tweet ID from various X/Twitter URL formats."""
-    patterns = [
-        r'(?:twitter|x)\.com/\w+/status/(\d+)',
-        r'(?:twitter|x)\.com/i/web/status/(\d+)',
-        r'(?:fxtwitter|vxtwitter|fixupx)\.com/\w+/status/(\d+)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    match = _TWEET_ID_RE.search(url)
+    return match.group(1) if match else None
 
 
 def extract_handle(url: str) -> Optional[str]:
     """Extract handle from URL."""
-    match = re.search(r'(?:twitter|x|fxtwitter|vxtwitter)\.com/(\w+)/status/', url)
+    match = _HANDLE_RE.search(url)
     if match:
         handle = match.group(1)
         if handle not in ('i', 'intent', 'share'):
@@ -93,14 +187,19 @@ def extract_handle(url: str) -> Optional[str]:
 
 def fetch_tweet_fxtwitter(tweet_id: str, handle: str = "i") -> Optional[dict]:
     """Fetch tweet data from FxTwitter API."""
+    cached = _cached_response("fxtwitter", tweet_id)
+    if cached is not None:
+        return cached
+
     url = f"{FXTWITTER_API}/{handle}/status/{tweet_id}"
 
     try:
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
-            if data.get("code") == 200:
-                return data.get("tweet")
+            if data.get("code") == 200 and data.get("tweet"):
+                _cache_response("fxtwitter", tweet_id, data["tweet"])
+                return data["tweet"]
     except Exception as e:
         logger.warning(f"FxTwitter API error: {e}")
 
@@ -109,12 +208,61 @@ def fetch_tweet_fxtwitter(tweet_id: str, handle: str = "i") -> Optional[dict]:
 
 def fetch_tweet_vxtwitter(tweet_id: str, handle: str = "i") -> Optional[dict]:
     """Fallback: Fetch from VxTwitter API."""
+    cached = _cached_response("vxtwitter", tweet_id)
+    if cached is not None:
+        return cached
+
     url = f"{VXTWITTER_API}/{handle}/status/{tweet_id}"
 
     try:
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            if data:
+                _cache_response("vxtwitter", tweet_id, data)
+            return data
+    except Exception as e:
+        logger.warning(f"VxTwitter API error: {e}")
+
+    return None
+
+
+async def fetch_tweet_fxtwitter_async(tweet_id: str, handle: str = "i") -> Optional[dict]:
+    """Fetch tweet data from FxTwitter API without blocking the event loop."""
+    cached = _cached_response("fxtwitter", tweet_id)
+    if cached is not None:
+        return cached
+
+    url = f"{FXTWITTER_API}/{handle}/status/{tweet_id}"
+
+    try:
+        response = await get_async_client().get(url)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("code") == 200 and data.get("tweet"):
+                _cache_response("fxtwitter", tweet_id, data["tweet"])
+                return data["tweet"]
+    except Exception as e:
+        logger.warning(f"FxTwitter API error: {e}")
+
+    return None
+
+
+async def fetch_tweet_vxtwitter_async(tweet_id: str, handle: str = "i") -> Optional[dict]:
+    """Fallback: Fetch from VxTwitter API without blocking the event loop."""
+    cached = _cached_response("vxtwitter", tweet_id)
+    if cached is not None:
+        return cached
+
+    url = f"{VXTWITTER_API}/{handle}/status/{tweet_id}"
+
+    try:
+        response = await get_async_client().get(url)
+        if response.status_code == 200:
+            data = response.json()
+            if data:
+                _cache_response("vxtwitter", tweet_id, data)
+            return data
     except Exception as e:
         logger.warning(f"VxTwitter API error: {e}")
 
@@ -180,7 +328,38 @@ def parse_tweet_data(data: dict, source: str = "fxtwitter") -> Tweet:
     return None
 
 
-def fetch_thread(tweet_url: str, max_depth: int = 25) -> Optional[Thread]:
+def _same_author_parent(data: dict, author_handle: str) -> Optional[str]:
+    """Get the ID of the tweet this one replies to, if it's by the thread author."""
+    parent_id = data.get("replying_to_status")
+    parent_handle = data.get("replying_to") or ""
+    if parent_id and parent_handle.lower() == author_handle.lower():
+        return parent_id
+    return None
+
+
+def _thread_tweets(data: dict, source: str, max_depth: int) -> List[Tweet]:
+    """Parse the shared tweet plus any same-author continuation tweets in the response."""
+    main_tweet = parse_tweet_data(data, source)
+    tweets = [main_tweet]
+    author_handle = main_tweet.author_handle
+
+    # FxTwitter provides thread info in the response
+    if source == "fxtwitter" and data.get("thread"):
+        thread_data = data["thread"]
+        # Thread contains array of tweet objects
+        for thread_tweet_data in thread_data.get("tweets", [])[1:]:  # Skip first, we have it
+            if len(tweets) >= max_depth:
+                break
+            tweet = parse_tweet_data(thread_tweet_data, source)
+            if tweet and tweet.author_handle.lower() == author_handle.lower():
+                tweets.append(tweet)
+
+    return tweets
+
+
+def fetch_thread(
+    tweet_url: str, max_depth: int = 25, tweet_id: str = None
+) -> Optional[Thread]:
     """
     Fetch a complete thread starting from a tweet URL.
 
@@ -188,8 +367,10 @@ def fetch_thread(tweet_url: str, max_depth: int = 25) -> Optional[Thread]:
     1. The shared tweet
     2. Parent tweets (if shared tweet is a reply in thread)
     3. Continuation tweets (same author replying to themselves)
+
+    Pass tweet_id if it was already extracted from the URL.
     """
-    tweet_id = extract_tweet_id(tweet_url)
+    tweet_id = tweet_id or extract_tweet_id(tweet_url)
     handle = extract_handle(tweet_url) or "i"
 
     if not tweet_id:
@@ -208,56 +389,91 @@ def fetch_thread(tweet_url: str, max_depth: int = 25) -> Optional[Thread]:
         logger.error(f"Could not fetch tweet {tweet_id}")
         return None
 
-    main_tweet = parse_tweet_data(data, source)
-    tweets = [main_tweet]
+    tweets = _thread_tweets(data, source, max_depth)
+    main_tweet = tweets[0]
     author_handle = main_tweet.author_handle
 
-    # FxTwitter provides thread info in the response
-    if source == "fxtwitter" and data.get("thread"):
-        thread_data = data["thread"]
-        # Thread contains array of tweet objects
-        for thread_tweet_data in thread_data.get("tweets", [])[1:]:  # Skip first, we have it
-            if len(tweets) >= max_depth:
-                break
-            tweet = parse_tweet_data(thread_tweet_data, source)
-            if tweet and tweet.author_handle.lower() == author_handle.lower():
-                tweets.append(tweet)
+    # Walk up parent tweets while this is a reply in the author's own thread.
+    # Each parent's ID is only known once its child is fetched, so the walk is
+    # sequential; the rate-limit delay counts from when the previous request
+    # started, so it overlaps that request's network time instead of adding to it.
+    current_data = data if source == "fxtwitter" else None
+    depth = 0
+    next_request_at = 0.0
+    while current_data and depth < max_depth:
+        parent_id = _same_author_parent(current_data, author_handle)
+        if not parent_id:
+            break
+        # Rate limiting - be nice to the API
+        wait = next_request_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        next_request_at = time.monotonic() + PARENT_FETCH_DELAY
+
+        current_data = fetch_tweet_fxtwitter(parent_id, author_handle)
+        if current_data:
+            tweets.insert(0, parse_tweet_data(current_data, "fxtwitter"))
+            depth += 1
+
+    return Thread(
+        tweets=tweets,
+        author_handle=author_handle,
+        author_name=main_tweet.author_name,
+        total_count=len(tweets),
+    )
+
+
+async def fetch_thread_async(
+    tweet_url: str, max_depth: int = 25, tweet_id: str = None
+) -> Optional[Thread]:
+    """
+    Fetch a complete thread without blocking the event loop.
+
+    Same as fetch_thread(), using the shared async HTTP client.
+    """
+    tweet_id = tweet_id or extract_tweet_id(tweet_url)
+    handle = extract_handle(tweet_url) or "i"
+
+    if not tweet_id:
+        logger.error(f"Could not extract tweet ID from: {tweet_url}")
+        return None
+
+    # Try FxTwitter first, fallback to VxTwitter
+    data = await fetch_tweet_fxtwitter_async(tweet_id, handle)
+    source = "fxtwitter"
+
+    if not data:
+        data = await fetch_tweet_vxtwitter_async(tweet_id, handle)
+        source = "vxtwitter"
+
+    if not data:
+        logger.error(f"Could not fetch tweet {tweet_id}")
+        return None
+
+    tweets = _thread_tweets(data, source, max_depth)
+    main_tweet = tweets[0]
+    author_handle = main_tweet.author_handle
 
-    # Check for parent tweet (if this is a reply in a thread)
-    if source == "fxtwitter" and data.get("replying_to"):
-        parent_handle = data.get("replying_to")
-        parent_id = data.get("replying_to_status")
-
-        # Only fetch parent if same author (part of thread)
-        if parent_handle and parent_handle.lower() == author_handle.lower() and parent_id:
-            parent_data = fetch_tweet_fxtwitter(parent_id, parent_handle)
-            if parent_data:
-                parent_tweet = parse_tweet_data(parent_data, "fxtwitter")
-                # Insert at beginning
-                tweets.insert(0, parent_tweet)
-
-                # Recursively check for more parents (up to limit)
-                depth = 1
-                current_data = parent_data
-                while depth < max_depth:
-                    if not current_data.get("replying_to_status"):
-                        break
-                    if current_data.get("replying_to", "").lower() != author_handle.lower():
-                        break
-
-                    grandparent_id = current_data["replying_to_status"]
-                    grandparent_data = fetch_tweet_fxtwitter(grandparent_id, author_handle)
-
-                    if not grandparent_data:
-                        break
-
-                    grandparent = parse_tweet_data(grandparent_data, "fxtwitter")
-                    tweets.insert(0, grandparent)
-                    current_data = grandparent_data
-                    depth += 1
-
-                    # Rate limiting - be nice to the API
-                    time.sleep(0.2)
+    # Walk up parent tweets while this is a reply in the author's own thread
+    # (paced from request start, as in fetch_thread())
+    loop = asyncio.get_running_loop()
+    current_data = data if source == "fxtwitter" else None
+    depth = 0
+    next_request_at = 0.0
+    while current_data and depth < max_depth:
+        parent_id = _same_author_parent(current_data, author_handle)
+        if not parent_id:
+            break
+        # Rate limiting - be nice to the API
+        wait = next_request_at - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        next_request_at = loop.time() + PARENT_FETCH_DELAY
+
+        current_data = await fetch_tweet_fxtwitter_async(parent_id, author_handle)
+        if current_data:
+            tweets.insert(0, parse_tweet_data(current_data, "fxtwitter"))
+            depth += 1
 
     return Thread(
         tweets=tweets,
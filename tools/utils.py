@@ -1,13 +1,27 @@
 """Shared utilities for the X/Twitter archive system."""
 
+import hashlib
 import json
 import logging
+import mmap
 import os
 import re
+import sqlite3
 import subprocess
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to ujson or the stdlib codec
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # ujson is optional; only used when orjson is missing
+    ujson = None
 
 logger = logging.getLogger(__name__)
 
@@ -18,74 +32,668 @@ DATA_DIR = BASE_DIR / "data"
 EXPORTS_DIR = BASE_DIR / "exports"
 COLLECTIONS_DIR = BASE_DIR / "archive" / "collections"
 
-# Ensure directories exist
+# Index additions since index.json was last written in full, one JSON object
+# per line (see append_index_entry); folded back in by compact_index()
+INDEX_LOG_PATH = DATA_DIR / "index.ndjson"
+INDEX_LOG_COMPACT_SIZE = 1024 * 1024  # compact automatically past this size
+
+# SQLite side index derived from data/index.json (rebuilt when the index changes)
+ARCHIVE_DB_PATH = DATA_DIR / "archive.db"
+ARCHIVE_DB_VERSION = 5  # bump when the schema changes to force a rebuild
+
+# Ensure directories exist (and remember the ones made, to skip repeat mkdirs)
+_created_dirs: set = set()
 for d in [ARCHIVE_DIR, DATA_DIR, EXPORTS_DIR, COLLECTIONS_DIR]:
     d.mkdir(parents=True, exist_ok=True)
+    _created_dirs.add(d)
+
+# Lazy-loaded singletons (PyYAML and pysimdjson are only imported when a
+# command needs them, keeping startup quick for the rest)
+_archive_db: Optional[sqlite3.Connection] = None
+_yaml_codec: Optional[tuple] = None
+_simdjson = None
+
+# Parsed data files: path (or derived-data name) -> (file signature, data);
+# reused until the file changes
+_data_cache: dict = {}
+
+
+_POST_ID_RE = re.compile(r'(?:twitter|x)\.com/(?:\w+|i/web)/status/(\d+)')
+_HANDLE_PATTERN = re.compile(r'(?:twitter|x)\.com/(\w+)/status/')
 
 
 def extract_post_id(url: str) -> Optional[str]:
     """Extract post ID from an X/Twitter URL."""
-    patterns = [
-        r'(?:twitter|x)\.com/\w+/status/(\d+)',
-        r'(?:twitter|x)\.com/i/web/status/(\d+)',
+    if "/status/" not in url:  # cheap rejection before running the regex
+        return None
+    match = _POST_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def extract_post_ids_bulk(urls: Iterable[str]) -> List[Optional[str]]:
+    """
+    Extract the post ID from each of many URLs (None where there is none).
+
+    Same result as calling extract_post_id() on each URL, without the
+    per-call function overhead.
+    """
+    search = _POST_ID_RE.search
+    return [
+        (match.group(1) if (match := search(url)) else None)
+        if "/status/" in url else None
+        for url in urls
     ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
 
 
 def extract_handle(url: str) -> Optional[str]:
     """Extract handle from an X/Twitter URL."""
-    match = re.search(r'(?:twitter|x)\.com/(\w+)/status/', url)
+    if "/status/" not in url:
+        return None
+    match = _HANDLE_PATTERN.search(url)
     if match:
-        return match.group(1)
+        # Handles repeat across many posts; share one string per handle
+        return sys.intern(match.group(1))
     return None
 
 
+def json_loads(data: bytes):
+    """Parse JSON bytes, using orjson (or ujson) when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def _read_json_file(path: Path):
+    """
+    Parse a JSON data file. With orjson, the file is memory-mapped and parsed
+    in place rather than first copied into a bytes object.
+    """
+    if orjson is None:
+        return json_loads(path.read_bytes())
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file: nothing to map
+            return orjson.loads(b"")
+    try:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+    finally:
+        mm.close()
+
+
+def json_dumps(obj, sort_keys: bool = False) -> bytes:
+    """Serialize to indented JSON bytes. Unknown types are stringified."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option)
+    if ujson is not None:
+        return ujson.dumps(
+            obj,
+            indent=2,
+            default=str,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+            sort_keys=sort_keys,
+        ).encode()
+    return json.dumps(
+        obj, indent=2, default=str, ensure_ascii=False, sort_keys=sort_keys
+    ).encode()
+
+
+def _json_line(obj) -> bytes:
+    """Serialize to one line of compact JSON (for NDJSON files)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if ujson is not None:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
 def get_post_path(post_id: str, archived_at: datetime = None) -> Path:
     """Get the file path for a post based on its ID and archive date."""
     if archived_at is None:
         archived_at = datetime.now()
-    year = archived_at.strftime("%Y")
-    month = archived_at.strftime("%m")
-    dir_path = ARCHIVE_DIR / year / month
-    dir_path.mkdir(parents=True, exist_ok=True)
+    dir_path = ARCHIVE_DIR / f"{archived_at.year:04d}" / f"{archived_at.month:02d}"
+    if dir_path not in _created_dirs:
+        dir_path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(dir_path)
     return dir_path / f"{post_id}.md"
 
 
+def _file_signature(path: Path) -> Optional[tuple]:
+    """Modification time and size of a file, or None if it doesn't exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _index_files_signature() -> tuple:
+    """Signatures of index.json and its append log (None for a missing file)."""
+    return (_file_signature(DATA_DIR / "index.json"), _file_signature(INDEX_LOG_PATH))
+
+
+def _replay_index_log(index: dict):
+    """Apply the entries appended to the index log since the last full save."""
+    for line in INDEX_LOG_PATH.read_bytes().splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json_loads(line)
+        except ValueError:  # e.g. a line cut short by a crash mid-append
+            logger.warning(f"Skipping unreadable line in {INDEX_LOG_PATH}")
+            continue
+        index.setdefault("posts", {}).update(record.get("posts", {}))
+        index["last_updated"] = record.get("last_updated", index.get("last_updated"))
+
+
 def load_index() -> dict:
-    """Load the main index file."""
+    """
+    Load the main index: index.json plus any entries appended to index.ndjson.
+
+    The parsed index is cached until either file changes, so repeated loads
+    return the same dict: save any changes made to it with save_index(), or
+    add single posts with append_index_entry().
+    """
     index_path = DATA_DIR / "index.json"
-    if index_path.exists():
-        with open(index_path) as f:
-            return json.load(f)
-    return {"posts": {}, "last_updated": None}
+    signature = _index_files_signature()
+    if signature == (None, None):
+        return {"posts": {}, "last_updated": None}
+    cached = _data_cache.get(index_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    if signature[0] is None:
+        index = {"posts": {}, "last_updated": None}
+    else:
+        index = _read_json_file(index_path)
+    if signature[1] is not None:
+        _replay_index_log(index)
+    _data_cache[index_path] = (signature, index)
+    return index
+
+
+def _write_json_file(path: Path, data: dict, sort_keys: bool = False):
+    """
+    Write a JSON data file atomically (temp file + rename), so readers never
+    see a half-written file. Stays indented: these files are tracked in git.
+    """
+    data = json_dumps(data, sort_keys=sort_keys)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)  # don't leave a partial file behind
+        raise
 
 
 def save_index(index: dict):
-    """Save the main index file."""
+    """Save the main index file in full (this also empties the append log)."""
     index["last_updated"] = datetime.now().isoformat()
     index_path = DATA_DIR / "index.json"
-    with open(index_path, "w") as f:
-        json.dump(index, f, indent=2)
+    _write_json_file(index_path, index)
+    INDEX_LOG_PATH.unlink(missing_ok=True)
+    _data_cache[index_path] = (_index_files_signature(), index)
+
+
+def append_index_entry(post_id: str, entry: dict):
+    """
+    Add or replace one post's index entry by appending it to index.ndjson.
+
+    Costs one short append instead of rewriting all of index.json;
+    load_index() replays the log. The log is compacted into index.json
+    once it grows past INDEX_LOG_COMPACT_SIZE. The entry's post file should
+    already be written: it is also added to the side index (best effort).
+    """
+    index = load_index()
+    previous_signature = _index_signature()
+    last_updated = datetime.now().isoformat()
+    line = _json_line({"posts": {post_id: entry}, "last_updated": last_updated})
+    with open(INDEX_LOG_PATH, "a+b") as f:
+        # Start on a fresh line if a crash left the last one unterminated
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line
+        f.write(line + b"\n")
+    index.setdefault("posts", {})[post_id] = entry
+    index["last_updated"] = last_updated
+    signature = _index_files_signature()
+    _data_cache[DATA_DIR / "index.json"] = (signature, index)
+    _add_to_archive_db(post_id, entry, previous_signature)
+    if signature[1] and signature[1][1] > INDEX_LOG_COMPACT_SIZE:
+        compact_index()
+
+
+def compact_index():
+    """Fold the append log into index.json and remove the log."""
+    if INDEX_LOG_PATH.exists():
+        save_index(load_index())
+
+
+def get_yaml() -> tuple:
+    """
+    Import PyYAML on first use (lazy singleton).
+
+    Returns (yaml module, loader, dumper), using the libyaml-based (C)
+    CSafeLoader/CSafeDumper when PyYAML was built with them.
+    """
+    global _yaml_codec
+    if _yaml_codec is None:
+        import yaml
+        _yaml_codec = (
+            yaml,
+            getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+            getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+        )
+    return _yaml_codec
+
+
+def get_simdjson():
+    """Import pysimdjson on first use; None if it isn't installed (lazy singleton)."""
+    global _simdjson
+    if _simdjson is None:
+        try:
+            import simdjson
+        except ImportError:  # pysimdjson is optional; used for read-only index lookups
+            simdjson = False
+        _simdjson = simdjson
+    return _simdjson or None
+
+
+def load_index_lazy():
+    """
+    Load the main index for read-only lookups of a few posts.
+
+    Returns the cached dict when load_index() already parsed the current
+    file. Otherwise, with pysimdjson installed, returns a lazy read-only
+    mapping that only builds Python objects for the entries accessed;
+    without it, falls back to load_index(). Use load_index() to modify.
+    """
+    index_path = DATA_DIR / "index.json"
+    cached = _data_cache.get(index_path)
+    signature = _index_files_signature()
+    simdjson = get_simdjson()
+    # The lazy view covers index.json only, so not while the log has entries
+    if simdjson is None or signature[1] is not None or (cached and cached[0] == signature):
+        return load_index()
+    try:
+        data = index_path.read_bytes()
+    except FileNotFoundError:
+        return {"posts": {}, "last_updated": None}
+    # A fresh parser per document: a parser can't be reused while objects
+    # from its previous document are still referenced.
+    return simdjson.Parser().parse(data)
 
 
 def load_tags() -> dict:
-    """Load the tags taxonomy file."""
+    """
+    Load the tags taxonomy file. Each tag/topic maps to a set of post IDs.
+
+    Cached like load_index(); save any changes with save_tags().
+    """
     tags_path = DATA_DIR / "tags.json"
-    if tags_path.exists():
-        with open(tags_path) as f:
-            return json.load(f)
-    return {"tags": {}, "topics": {}}
+    signature = _file_signature(tags_path)
+    if signature is None:
+        return {"tags": {}, "topics": {}}
+    cached = _data_cache.get(tags_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    tags = _read_json_file(tags_path)
+    for section in ("tags", "topics"):
+        tags[section] = {
+            name: set(post_ids) for name, post_ids in tags.get(section, {}).items()
+        }
+    _data_cache[tags_path] = (signature, tags)
+    return tags
 
 
 def save_tags(tags: dict):
-    """Save the tags taxonomy file."""
+    """
+    Save the tags taxonomy file, writing each set of post IDs as a sorted
+    list and the tag/topic names in sorted order (stable git diffs).
+    """
+    data = dict(tags)
+    for section in ("tags", "topics"):
+        data[section] = {
+            name: sorted(post_ids) for name, post_ids in tags.get(section, {}).items()
+        }
     tags_path = DATA_DIR / "tags.json"
-    with open(tags_path, "w") as f:
-        json.dump(tags, f, indent=2)
+    _write_json_file(tags_path, data, sort_keys=True)
+    _data_cache[tags_path] = (_file_signature(tags_path), tags)
+
+
+def _index_signature() -> str:
+    """Identify the current index files (and side index schema) by modification time and size."""
+    parts = [f"v{ARCHIVE_DB_VERSION}"]
+    for signature in _index_files_signature():
+        parts.extend(map(str, signature or (0, 0)))
+    return ":".join(parts)
+
+
+_ARCHIVE_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT PRIMARY KEY,
+    path TEXT,
+    author TEXT,
+    archived_at TEXT,
+    tags TEXT,
+    topics TEXT,
+    importance TEXT,
+    is_thread INTEGER,
+    file_mtime_ns INTEGER,
+    file_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS post_tags (
+    kind TEXT,
+    name TEXT COLLATE NOCASE,
+    post_id TEXT,
+    PRIMARY KEY (kind, name, post_id)
+);
+CREATE INDEX IF NOT EXISTS post_tags_post_id_idx ON post_tags(post_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+    post_id UNINDEXED, body, notes, tags, topics, tokenize='trigram'
+);
+"""
+
+
+def _write_archive_db_post(conn: sqlite3.Connection, post_id: str, entry: dict):
+    """
+    Insert or replace one post's rows in the side index, reading its post file.
+
+    Author, importance, tags and topics come from the post's frontmatter
+    (tags and topics lowercased), not from its index entry. The file's
+    modification time and size are stored with the row so that
+    get_archive_db() can re-index the post when the file is edited.
+    """
+    metadata = {}
+    body = ""
+    file_signature = None
+    if entry.get("path"):
+        post_path = BASE_DIR / entry["path"]
+        file_signature = _file_signature(post_path)
+        if file_signature is not None:
+            try:
+                post = parse_post_file(post_path)
+                if not isinstance(post["metadata"] or {}, dict):
+                    raise ValueError("frontmatter is not a mapping")
+                metadata = post["metadata"] or {}
+                body = post["body"]
+            except Exception as e:  # e.g. malformed YAML frontmatter
+                # Index the ID alone; the file is retried once it changes
+                logger.warning(f"Could not parse {post_path} for the archive index: {e}")
+
+    author = metadata.get("author")
+    handle = author.get("handle") if isinstance(author, dict) else None
+    importance = metadata.get("importance")
+    notes = str(metadata.get("notes") or "")
+    tags = [t.lower() for t in metadata.get("tags") or [] if isinstance(t, str)]
+    topics = [t.lower() for t in metadata.get("topics") or [] if isinstance(t, str)]
+    conn.execute(
+        "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            post_id,
+            entry.get("path"),
+            handle if isinstance(handle, str) else None,
+            entry.get("archived_at"),
+            json.dumps(tags),
+            json.dumps(topics),
+            importance if isinstance(importance, str) else None,
+            int(bool(entry.get("is_thread"))),
+            *(file_signature or (None, None)),
+        ),
+    )
+    conn.execute("DELETE FROM post_fts WHERE post_id = ?", (post_id,))
+    conn.execute(
+        "INSERT INTO post_fts VALUES (?, ?, ?, ?, ?)",
+        (post_id, body, notes, " ".join(tags), " ".join(topics)),
+    )
+    conn.execute("DELETE FROM post_tags WHERE post_id = ?", (post_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO post_tags VALUES (?, ?, ?)",
+        [("tag", tag, post_id) for tag in tags]
+        + [("topic", topic, post_id) for topic in topics],
+    )
+
+
+def _rebuild_archive_db(conn: sqlite3.Connection):
+    """Rebuild the side index from index.json and the post files."""
+    signature = _index_signature()
+    index = load_index()
+    # Recreate the tables rather than emptying them, in case the schema changed
+    conn.executescript(
+        "DROP TABLE IF EXISTS posts; DROP TABLE IF EXISTS post_tags;"
+        " DROP TABLE IF EXISTS post_fts;" + _ARCHIVE_DB_SCHEMA
+    )
+    with conn:
+        for post_id, entry in index.get("posts", {}).items():
+            _write_archive_db_post(conn, post_id, entry)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('index_signature', ?)", (signature,)
+        )
+    logger.info(f"Rebuilt archive index database ({len(index.get('posts', {}))} posts)")
+
+
+def _open_archive_db() -> sqlite3.Connection:
+    """Open the side index database, creating its schema (lazy singleton)."""
+    global _archive_db
+    if _archive_db is None:
+        conn = sqlite3.connect(ARCHIVE_DB_PATH)
+        conn.executescript(_ARCHIVE_DB_SCHEMA)
+        _archive_db = conn
+    return _archive_db
+
+
+def _refresh_archive_db_posts(conn: sqlite3.Connection):
+    """Re-index the posts whose files changed since they were indexed."""
+    changed = []
+    for post_id, path, mtime_ns, size in conn.execute(
+        "SELECT post_id, path, file_mtime_ns, file_size FROM posts WHERE path IS NOT NULL"
+    ):
+        signature = _file_signature(BASE_DIR / path)
+        if signature != ((mtime_ns, size) if mtime_ns is not None else None):
+            changed.append(post_id)
+    if not changed:
+        return
+    posts = load_index().get("posts", {})
+    with conn:
+        for post_id in changed:
+            _write_archive_db_post(conn, post_id, posts.get(post_id, {}))
+    logger.info(f"Re-indexed {len(changed)} changed posts in the archive index database")
+
+
+def get_archive_db(refresh_files: bool = True) -> sqlite3.Connection:
+    """
+    Get the SQLite side index over the archive, bringing it up to date.
+
+    The whole side index is rebuilt when index.json or index.ndjson changed.
+    With refresh_files, single posts are also re-indexed when their post
+    file changed, at one stat per post: call it once per search and reuse
+    the connection. Lookups by post ID alone don't need the refresh.
+
+    Tables: posts (one row per index entry), post_tags (kind "tag"/"topic",
+    lowercased name, post_id) and post_fts (FTS5 trigram index over body,
+    notes, tags, topics). index.json stays the source of truth.
+    """
+    conn = _open_archive_db()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'index_signature'").fetchone()
+    if row is None or row[0] != _index_signature():
+        _rebuild_archive_db(conn)
+    elif refresh_files:
+        _refresh_archive_db_posts(conn)
+    return conn
+
+
+def _add_to_archive_db(post_id: str, entry: dict, previous_signature: str):
+    """
+    Record a newly appended index entry in the side index without a rebuild.
+
+    Only done while the side index matched the index files as they were
+    before the append (previous_signature); otherwise get_archive_db()
+    rebuilds it on next use. Failures are logged and mark the side index
+    stale rather than failing the add.
+    """
+    if _archive_db is None and not ARCHIVE_DB_PATH.exists():
+        return  # built on first use
+    try:
+        conn = _open_archive_db()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'index_signature'").fetchone()
+        if row is None or row[0] != previous_signature:
+            return
+        with conn:
+            _write_archive_db_post(conn, post_id, entry)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('index_signature', ?)",
+                (_index_signature(),),
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update the archive index database: {e}")
+        _invalidate_archive_db()
+
+
+def _invalidate_archive_db():
+    """Forget the side index's signature so the next get_archive_db() rebuilds it."""
+    try:
+        with _open_archive_db() as conn:
+            conn.execute("DELETE FROM meta WHERE key = 'index_signature'")
+    except sqlite3.Error as e:
+        logger.warning(f"Could not mark the archive index database stale: {e}")
+
+
+def split_frontmatter(content: str) -> tuple[Optional[str], str]:
+    """Split post file text into raw YAML frontmatter (None if absent) and body."""
+    if content.startswith("---"):
+        end = content.find("---", 3)
+        if end >= 0:
+            return content[3:end], content[end + 3:].strip()
+    return None, content
+
+
+def parse_frontmatter(frontmatter: str) -> dict:
+    """Parse YAML frontmatter, with the libyaml-based loader when available."""
+    yaml, loader, _ = get_yaml()
+    return yaml.load(frontmatter, Loader=loader)
+
+
+# Characters a YAML double-quoted scalar can't hold literally: control
+# characters, YAML line breaks (NEL, LS, PS) and the BOM. Surrogates and
+# non-characters have no escape libyaml accepts, so those go through PyYAML.
+_YAML_ESCAPE_RE = re.compile(r'["\\\x00-\x1f\x7f-\x9f\u2028\u2029\ufeff]')
+_YAML_UNSAFE_RE = re.compile(r"[\ud800-\udfff\ufffe\uffff]")
+_YAML_SHORT_ESCAPES = {'"': '\\"', "\\": "\\\\", "\n": "\\n", "\t": "\\t", "\r": "\\r"}
+_YAML_KEY_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _yaml_escape(match: re.Match) -> str:
+    char = match.group()
+    escape = _YAML_SHORT_ESCAPES.get(char)
+    if escape:
+        return escape
+    code = ord(char)
+    return f"\\x{code:02x}" if code <= 0xFF else f"\\u{code:04x}"
+
+
+def _yaml_scalar(value) -> str:
+    if isinstance(value, str):
+        if _YAML_UNSAFE_RE.search(value):
+            raise TypeError("string needs PyYAML's escaping")
+        return f'"{_YAML_ESCAPE_RE.sub(_yaml_escape, value)}"'
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if value == {}:
+        return "{}"
+    if value == []:
+        return "[]"
+    raise TypeError(f"unsupported frontmatter value: {value!r}")
+
+
+def _emit_yaml(value, indent: str, lines: list):
+    """Append a dict's entries as block YAML lines (recursive)."""
+    for key, item in value.items():
+        if not isinstance(key, str) or not _YAML_KEY_RE.fullmatch(key):
+            raise TypeError(f"unsupported frontmatter key: {key!r}")
+        if isinstance(item, dict) and item:
+            lines.append(f"{indent}{key}:")
+            _emit_yaml(item, indent + "  ", lines)
+        elif isinstance(item, list) and item:
+            lines.append(f"{indent}{key}:")
+            for element in item:
+                if isinstance(element, dict) and element:
+                    nested = []
+                    _emit_yaml(element, indent + "    ", nested)
+                    lines.append(f"{indent}  - {nested[0].lstrip()}")
+                    lines.extend(nested[1:])
+                else:
+                    lines.append(f"{indent}  - {_yaml_scalar(element)}")
+        else:
+            lines.append(f"{indent}{key}: {_yaml_scalar(item)}")
+
+
+def dump_frontmatter(metadata: dict) -> str:
+    """
+    Serialize post metadata as YAML frontmatter (without the --- fences).
+
+    Post metadata has a small, fixed shape (strings, ints, bools, nested
+    dicts and lists), so it is written directly with every string
+    double-quoted; anything else falls back to PyYAML.
+    """
+    lines = []
+    try:
+        _emit_yaml(metadata, "", lines)
+    except TypeError:
+        yaml, _, dumper = get_yaml()
+        return yaml.dump(
+            metadata,
+            Dumper=dumper,
+            default_flow_style=False,
+            allow_unicode=True,
+            sort_keys=False,
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+def load_post_metadata(file_path: Path, frontmatter: Optional[str]) -> dict:
+    """
+    Parse a post's frontmatter, reusing its .meta.json sidecar when current.
+
+    The sidecar (next to the .md file) holds the parsed metadata plus a hash
+    of the frontmatter text it came from, so it is used only while the
+    frontmatter is unchanged. Metadata that doesn't survive a JSON round
+    trip (e.g. unquoted YAML dates) is always parsed from YAML.
+    """
+    if frontmatter is None:
+        return {}
+    digest = hashlib.blake2b(frontmatter.encode(), digest_size=16).hexdigest()
+    meta_path = Path(file_path).with_suffix(".meta.json")
+    try:
+        cached = json_loads(meta_path.read_bytes())
+        if cached.get("frontmatter_hash") == digest:
+            return cached["metadata"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    metadata = parse_frontmatter(frontmatter)
+    data = json_dumps({"frontmatter_hash": digest, "metadata": metadata})
+    if json_loads(data)["metadata"] == metadata:
+        try:
+            tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            logger.debug(f"Could not write metadata cache {meta_path}: {e}")
+    return metadata
 
 
 def parse_post_file(file_path: Path) -> dict:
@@ -93,44 +701,32 @@ def parse_post_file(file_path: Path) -> dict:
     with open(file_path) as f:
         content = f.read()
 
-    # Parse YAML frontmatter
-    if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            import yaml
-            frontmatter = yaml.safe_load(parts[1])
-            body = parts[2].strip()
-            return {"metadata": frontmatter, "body": body}
-
-    return {"metadata": {}, "body": content}
+    frontmatter, body = split_frontmatter(content)
+    return {"metadata": load_post_metadata(file_path, frontmatter), "body": body}
 
 
 def format_post_for_llm(post: dict, include_metadata: bool = True) -> str:
     """Format a post for LLM consumption."""
-    lines = []
     meta = post.get("metadata", {})
-
-    if include_metadata:
-        lines.append(f"## Post by @{meta.get('author', {}).get('handle', 'unknown')}")
-        if meta.get("posted_at"):
-            lines.append(f"**Date:** {meta['posted_at']}")
-        if meta.get("url"):
-            lines.append(f"**URL:** {meta['url']}")
-        if meta.get("tags"):
-            lines.append(f"**Tags:** {', '.join(meta['tags'])}")
-        if meta.get("topics"):
-            lines.append(f"**Topics:** {', '.join(meta['topics'])}")
-        lines.append("")
-
-    lines.append("### Content")
-    lines.append(post.get("body", meta.get("content", "")))
-
-    if meta.get("notes"):
-        lines.append("")
-        lines.append("### Notes")
-        lines.append(meta["notes"])
-
-    return "\n".join(lines)
+    body = post.get("body", meta.get("content", ""))
+    notes = meta.get("notes")
+    notes = f"\n\n### Notes\n{notes}" if notes else ""
+    if not include_metadata:
+        return f"### Content\n{body}{notes}"
+
+    handle = meta.get("author", {}).get("handle", "unknown")
+    posted_at = meta.get("posted_at")
+    url = meta.get("url")
+    tags = meta.get("tags")
+    topics = meta.get("topics")
+    date = f"**Date:** {posted_at}\n" if posted_at else ""
+    url = f"**URL:** {url}\n" if url else ""
+    tags = f"**Tags:** {', '.join(tags)}\n" if tags else ""
+    topics = f"**Topics:** {', '.join(topics)}\n" if topics else ""
+    return (
+        f"## Post by @{handle}\n"
+        f"{date}{url}{tags}{topics}\n### Content\n{body}{notes}"
+    )
 
 
 def git_sync(message: str = None) -> bool:
@@ -212,5 +808,12 @@ def git_sync(message: str = None) -> bool:
 
 def check_duplicate(post_id: str) -> bool:
     """Check if a post is already archived."""
-    index = load_index()
-    return post_id in index.get("posts", {})
+    try:
+        row = get_archive_db(refresh_files=False).execute(
+            "SELECT 1 FROM posts WHERE post_id = ?", (post_id,)
+        ).fetchone()
+        return row is not None
+    except sqlite3.Error as e:
+        logger.warning(f"Archive index database unavailable, using index.json: {e}")
+        index = load_index()
+        return post_id in index.get("posts", {})
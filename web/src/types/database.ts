@@ -260,7 +260,8 @@ export interface Database {
         };
         Returns: Array<{
           id: string;
-          content: string;
+          author_handle: string | null;
+          tags: string[] | null;
           similarity: number;
         }>;
       };